@@ -0,0 +1,70 @@
+"""Crawler monitoring endpoints"""
+from fastapi import APIRouter
+from ....services import crawler_service
+from ....services.crawler import SOURCES
+from ....services.source_guard import source_guard
+from ....services.prefetch import prefetch_scheduler
+from ....services.singleflight import single_flight
+from ....services.mirror_crawler import mirror_crawler
+from ....services.known_bad_index import known_bad_index
+from ....services.crawl_queue import crawl_queue
+from ....services.crawl_scheduler import crawl_scheduler
+
+router = APIRouter()
+
+
+@router.get("/pool")
+async def get_driver_pool_stats():
+    """Get Chrome driver pool size, wait time and recycle counts"""
+    return crawler_service.driver_pool.get_stats()
+
+
+@router.get("/singleflight")
+async def get_single_flight_stats():
+    """Get counters for coalesced in-flight searches"""
+    return single_flight.get_stats()
+
+
+@router.get("/mirror")
+async def get_mirror_stats():
+    """Get the last listing-mirror run per source"""
+    return {
+        "running": mirror_crawler.is_running,
+        "sources": mirror_crawler.last_runs,
+    }
+
+
+@router.get("/known-bad")
+async def get_known_bad_index_stats():
+    """Get size and freshness of the in-process reported-number index"""
+    return known_bad_index.get_stats()
+
+
+@router.get("/queue")
+async def get_crawl_queue_stats():
+    """Get crawl mode and worker stream backlog"""
+    return await crawl_queue.get_stats()
+
+
+@router.get("/scheduler")
+async def get_crawl_scheduler_stats():
+    """Get Chrome slot usage and queue depth per priority class"""
+    return crawl_scheduler.get_stats()
+
+
+@router.get("/sources")
+async def get_source_states():
+    """Get circuit breaker state and rate-limit tokens for each scrape target"""
+    return {
+        source: {"name": name, **await source_guard.get_state(source)}
+        for source, name in SOURCES.items()
+    }
+
+
+@router.get("/prefetch")
+async def get_prefetch_stats():
+    """Get the last cache warm-up run"""
+    return {
+        "running": prefetch_scheduler.is_running,
+        "last_run": prefetch_scheduler.last_run,
+    }
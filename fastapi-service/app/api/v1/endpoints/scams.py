@@ -1,16 +1,73 @@
 """Scam search endpoints"""
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import Optional
-from ....schemas import ScamSearchResponse
-from ....services import crawler_service, cache_service
-from ....database import get_db
+from fastapi.responses import StreamingResponse
+from typing import Optional, AsyncIterator, List
+from ....schemas import ScamSearchResponse, ScamBulkSearchRequest, ScamSearchRequest
+from ....services import crawler_service
+from ....services.crawler import SOURCES
+from ....services.keywords import normalize_keyword
+from ....services.scam_index import scam_index
+from ....services.known_bad_index import known_bad_index
+from ....services.search_jobs import search_job_service
+from ....database import get_db, SessionLocal
+from ....config import settings
 from ....models import ScamSearch
 from sqlalchemy.orm import Session
+import asyncio
+import json
 import time
 
 router = APIRouter()
 
 
+def log_search(
+    db: Session,
+    keyword: str,
+    results_count: int,
+    response_time_ms: int,
+    source: str = "web",
+    zalo_user_id: Optional[str] = None
+):
+    """Log a search to the database"""
+    try:
+        search_log = ScamSearch(
+            keyword=keyword,
+            source=source,
+            zalo_user_id=zalo_user_id,
+            results_count=results_count,
+            response_time_ms=response_time_ms
+        )
+        db.add(search_log)
+        db.commit()
+    except Exception as e:
+        print(f"Failed to log search: {e}")
+        db.rollback()
+
+
+def require_keyword(keyword: str) -> str:
+    """Normalized keyword, or 400 when nothing searchable is left"""
+    keyword = normalize_keyword(keyword)
+    if not keyword:
+        raise HTTPException(status_code=400, detail="Keyword is empty")
+    return keyword
+
+
+def raise_if_saturated(result: dict):
+    """429 when every source was shed and there is nothing else to serve"""
+    retry_after = crawler_service.shed_retry_after(result)
+    if retry_after is None:
+        return
+    raise HTTPException(
+        status_code=429,
+        detail={
+            "message": "Crawler is busy, try again shortly",
+            "retry_after": retry_after,
+            "queue_depth": max(s.get("queue_depth", 0) for s in result["sources"]),
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
 @router.get("/search", response_model=ScamSearchResponse)
 async def search_scams(
     keyword: str = Query(..., min_length=1, max_length=255, description="Phone number, account number, or name"),
@@ -25,87 +82,222 @@ async def search_scams(
     """
     start_time = time.time()
     source_type = type or "all"
+    keyword = require_keyword(keyword)
     
-    # Check cache first
-    cached_result = await cache_service.get_scam_search(keyword, source_type)
-    if cached_result:
-        cached_result["cached"] = True
-        cached_result["response_time_ms"] = int((time.time() - start_time) * 1000)
-        
-        # Increment cache hit
-        await cache_service.increment_hit(f"scam:search:{source_type}:{keyword}")
-        
-        return cached_result
+    source_types = list(SOURCES) if source_type == "all" else [source_type]
+    
+    # Instant reported/not-reported answer from the in-process index
+    preliminary_verdict = known_bad_index.verdict(keyword)
+    
+    # Locally indexed records for phone/account searches stand in for
+    # sources the search below can't answer (shed, timed out, failed)
+    indexed = scam_index.indexed_sources(keyword, {SOURCES[source] for source in source_types}, db)
     
     try:
-        # Perform search
-        if source_type == "all":
-            result = await crawler_service.search_all_sources(keyword)
-        elif source_type == "admin":
-            driver = crawler_service.init_driver()
-            result = crawler_service.scrape_admin_vn(keyword, driver)
-            result = {
-                "success": result["success"],
-                "keyword": keyword,
-                "total_results": int(result.get("total_scams", 0)) if str(result.get("total_scams", "0")).isdigit() else 0,
-                "sources": [result]
-            }
-        elif source_type == "checkscam":
-            driver = crawler_service.init_driver()
-            result = crawler_service.scrape_checkscam_vn(keyword, driver)
-            result = {
-                "success": result["success"],
-                "keyword": keyword,
-                "total_results": int(result.get("total_scams", 0)) if str(result.get("total_scams", "0")).isdigit() else 0,
-                "sources": [result]
-            }
-        elif source_type == "scam":
-            driver = crawler_service.init_driver()
-            result = crawler_service.scrape_scam_vn(keyword, driver)
-            result = {
-                "success": result["success"],
-                "keyword": keyword,
-                "total_results": int(result.get("total_scams", 0)) if str(result.get("total_scams", "0")).isdigit() else 0,
-                "sources": [result]
-            }
-        elif source_type == "chongluadao":
-            result = await crawler_service.scrape_chongluadao_vn(keyword)
-            result = {
-                "success": result["success"],
-                "keyword": keyword,
-                "total_results": result.get("total_scams", 0),
-                "sources": [result]
-            }
-        else:
-            raise HTTPException(status_code=400, detail="Invalid source type")
+        # Perform search; each source is served from its own cache entry
+        # when present and crawled otherwise
+        result = await crawler_service.search_all_sources(keyword, source_types)
+        result = crawler_service.merge_indexed(keyword, result, indexed)
+        result["preliminary_verdict"] = preliminary_verdict
+        raise_if_saturated(result)
         
         response_time_ms = int((time.time() - start_time) * 1000)
-        result["cached"] = False
         result["response_time_ms"] = response_time_ms
         
-        # Cache the result
-        await cache_service.set_scam_search(keyword, result, source_type)
-        
-        # Log search to database
-        try:
-            search_log = ScamSearch(
-                keyword=keyword,
-                source="web",
-                results_count=result["total_results"],
-                response_time_ms=response_time_ms
-            )
-            db.add(search_log)
-            db.commit()
-        except Exception as e:
-            print(f"Failed to log search: {e}")
-            db.rollback()
+        # Log search to database (cached ones too: the history drives prefetch)
+        log_search(db, keyword, result["total_results"], response_time_ms)
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
+def format_stream_frame(event: str, payload: dict, format: str) -> str:
+    """Encode one stream frame as NDJSON or Server-Sent Events"""
+    data = json.dumps(payload, ensure_ascii=False)
+    if format == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return json.dumps({"event": event, **payload}, ensure_ascii=False) + "\n"
+
+
+async def stream_search_frames(keyword: str, source_type: str, format: str) -> AsyncIterator[str]:
+    """Emit each source result as it finishes, then a final aggregate frame"""
+    start_time = time.time()
+    
+    source_types = list(SOURCES) if source_type == "all" else [source_type]
+    
+    preliminary_verdict = known_bad_index.verdict(keyword)
+    if preliminary_verdict:
+        yield format_stream_frame("verdict", preliminary_verdict, format)
+    
+    results = {}
+    try:
+        indexed = asyncio.ensure_future(crawler_service.lookup_indexed(keyword, source_types))
+        async for source, source_result in crawler_service.iter_all_sources(keyword, source_types):
+            results[source] = source_result
+            yield format_stream_frame("source", {"source": source_result.get("source"), "data": source_result}, format)
+    except Exception as e:
+        yield format_stream_frame("error", {"detail": f"Search failed: {str(e)}"}, format)
+        return
+    
+    result = crawler_service.build_search_result(keyword, [results[source] for source in source_types])
+    # Same index fallback as /search, so both return the same payload
+    result = crawler_service.merge_indexed(keyword, result, await indexed)
+    result["preliminary_verdict"] = preliminary_verdict
+    response_time_ms = int((time.time() - start_time) * 1000)
+    result["response_time_ms"] = response_time_ms
+    yield format_stream_frame("done", result, format)
+    
+    # Log once the client has the final frame
+    db = SessionLocal()
+    try:
+        log_search(db, keyword, result["total_results"], response_time_ms)
+    finally:
+        db.close()
+
+
+@router.get("/search/stream")
+async def search_scams_stream(
+    keyword: str = Query(..., min_length=1, max_length=255, description="Phone number, account number, or name"),
+    type: Optional[str] = Query(None, regex="^(admin|checkscam|scam|chongluadao|all)$", description="Source type"),
+    format: str = Query("ndjson", regex="^(ndjson|sse)$", description="Stream format")
+):
+    """
+    Streaming variant of /search
+    
+    For phone/account keywords a `verdict` frame from the in-process
+    reported-number index comes first. Then a `source` frame is emitted for
+    each source the moment it finishes, followed by a final `done` frame
+    with the same payload as /search.
+    
+    - **format**: `ndjson` (one JSON object per line) or `sse` (Server-Sent Events)
+    """
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_search_frames(require_keyword(keyword), type or "all", format),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def stream_bulk_frames(keywords: List[str], source_type: str) -> AsyncIterator[str]:
+    """Emit one NDJSON line per keyword as it resolves, then a summary line"""
+    start_time = time.time()
+    source_types = list(SOURCES) if source_type == "all" else [source_type]
+    
+    counts = {"keywords": len(keywords), "cached": 0, "flagged": 0}
+    try:
+        async for result in crawler_service.iter_bulk_search(keywords, source_types):
+            result["preliminary_verdict"] = known_bad_index.verdict(result["keyword"])
+            counts["cached"] += result["cached"]
+            counts["flagged"] += result["total_results"] > 0
+            yield format_stream_frame("result", result, "ndjson")
+    except Exception as e:
+        yield format_stream_frame("error", {"detail": f"Bulk search failed: {str(e)}"}, "ndjson")
+        return
+    
+    counts["response_time_ms"] = int((time.time() - start_time) * 1000)
+    yield format_stream_frame("done", counts, "ndjson")
+
+
+@router.post("/search/bulk")
+async def search_scams_bulk(request: ScamBulkSearchRequest):
+    """
+    Check many keywords in one request
+    
+    Keywords are normalized and de-duplicated; cached ones are answered from
+    a single Redis read and only the misses are crawled, a few at a time.
+    Streams NDJSON: one `result` line per keyword (same payload as /search)
+    in completion order, then a `done` line with counts.
+    
+    - **keywords**: Up to BULK_SEARCH_MAX_KEYWORDS phone numbers, accounts, or names
+    - **type**: Source to search (admin, checkscam, scam, chongluadao, or all). Default: all
+    """
+    normalized = (normalize_keyword(keyword) for keyword in request.keywords)
+    keywords = list(dict.fromkeys(keyword for keyword in normalized if 0 < len(keyword) <= 255))
+    
+    if not keywords:
+        raise HTTPException(status_code=400, detail="No valid keywords")
+    if len(keywords) > settings.BULK_SEARCH_MAX_KEYWORDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many keywords (max {settings.BULK_SEARCH_MAX_KEYWORDS})"
+        )
+    
+    return StreamingResponse(
+        stream_bulk_frames(keywords, request.type or "all"),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def log_job_search(result: dict, start_time: float):
+    """Log a finished search job once its result is known"""
+    db = SessionLocal()
+    try:
+        log_search(db, result["keyword"], result["total_results"], int((time.time() - start_time) * 1000))
+    finally:
+        db.close()
+
+
+@router.post("/jobs", status_code=202)
+async def create_search_job(request: ScamSearchRequest):
+    """
+    Start a search in the background and return its job ID immediately
+    
+    Poll `GET /jobs/{id}` or subscribe to `GET /jobs/{id}/events` (SSE) for
+    per-source progress and the final result (same payload as /search).
+    """
+    source_type = request.type or "all"
+    if source_type != "all" and source_type not in SOURCES:
+        raise HTTPException(status_code=400, detail=f"Unknown source type: {source_type}")
+    
+    keyword = require_keyword(request.keyword)
+    source_types = list(SOURCES) if source_type == "all" else [source_type]
+    
+    start_time = time.time()
+    job = await search_job_service.submit(
+        keyword, source_types, on_done=lambda result: log_job_search(result, start_time)
+    )
+    job["preliminary_verdict"] = known_bad_index.verdict(keyword)
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_search_job(job_id: str):
+    """Get a search job's status, finished sources and final result"""
+    job = await search_job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+async def stream_job_frames(job_id: str) -> AsyncIterator[str]:
+    async for event in search_job_service.events(job_id):
+        yield format_stream_frame(event["event"], event["payload"], "sse")
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_search_job(job_id: str):
+    """
+    Server-Sent Events for a search job
+    
+    Sends a `state` event with the current job state, then a `source` event
+    per finished source and a final `done` (or `failed`) event.
+    """
+    if await search_job_service.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    
+    return StreamingResponse(
+        stream_job_frames(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/admin")
 async def search_admin_vn(
     keyword: str = Query(..., min_length=1, description="Keyword to search"),
@@ -1,70 +1,140 @@
 """Zalo OA webhook and messaging endpoints"""
 from fastapi import APIRouter, HTTPException, Request, Header, Depends, BackgroundTasks
 from typing import Optional, List
-import re
 from ....schemas import (
     ZaloWebhookEvent, ZaloSendMessageRequest, ZaloSendMessageResponse,
     BroadcastCampaignCreate, BroadcastCampaignResponse, 
     BroadcastStatsResponse, BroadcastSendRequest
 )
 from ....services import zalo_service, crawler_service, ai_service
-from ....database import get_db
+from ....services.known_bad_index import known_bad_index
+from .scams import log_search
+from ....services.keywords import (
+    is_phone_number, is_bank_account, is_url, extract_searchable_keyword
+)
+from ....database import get_db, SessionLocal
+from ....config import settings
 from ....models import ZaloUser, ZaloMessage, BroadcastCampaign, BroadcastLog
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from datetime import datetime
+import asyncio
+import time
 
 router = APIRouter()
 
 
-def is_phone_number(text: str) -> bool:
-    """Check if text is a phone number"""
-    # Vietnamese phone number patterns
-    pattern = r'^(0|\+84)[0-9]{9,10}$'
-    clean_text = re.sub(r'[\s\-\.]', '', text.strip())
-    return bool(re.match(pattern, clean_text))
+def format_preliminary_verdict(keyword: str) -> str:
+    """Instant verdict line from the in-process reported-number index"""
+    verdict = known_bad_index.verdict(keyword)
+    if verdict and verdict["reported"]:
+        return "🚨 Số này ĐÃ CÓ trong danh sách bị báo cáo lừa đảo. Đang lấy chi tiết...\n\n"
+    return ""
 
 
-def is_bank_account(text: str) -> bool:
-    """Check if text is a bank account number"""
-    # Bank account: 6-16 digits
-    pattern = r'^[0-9]{6,16}$'
-    clean_text = text.strip()
-    return bool(re.match(pattern, clean_text))
+# Deferred replies still pending for users who hit a saturated crawler
+deferred_replies = set()
 
 
-def is_url(text: str) -> bool:
-    """Check if text contains URL"""
-    url_pattern = r'https?://[^\s]+|www\.[^\s]+|[^\s]+\.(com|vn|org|net|io|me|edu|gov)[^\s]*'
-    return bool(re.search(url_pattern, text.lower()))
+async def search_for_zalo(user_id: str, keyword: str) -> str:
+    """Search for a Zalo user; if the crawler is saturated, promise a later reply"""
+    start_time = time.time()
+    search_result = await crawler_service.search_all_sources(keyword, priority="interactive")
+    retry_after = crawler_service.shed_retry_after(search_result)
+    if retry_after is None:
+        db = SessionLocal()
+        try:
+            log_search(
+                db, keyword, search_result["total_results"], int((time.time() - start_time) * 1000),
+                source="zalo", zalo_user_id=user_id
+            )
+        finally:
+            db.close()
+        # Late sources keep crawling into the cache; send the full result after
+        if search_result.get("partial"):
+            schedule_deferred_result(user_id, keyword, int(settings.ADMISSION_EST_CRAWL_SECONDS))
+        return await format_scam_results_for_zalo(
+            search_result, keyword, follow_up=search_result.get("partial", False)
+        )
+    
+    schedule_deferred_result(user_id, keyword, retry_after)
+    return f"""⏳ Hệ thống đang bận
 
+Tôi sẽ gửi kết quả kiểm tra {keyword} cho bạn trong ít phút nữa."""
 
-def extract_searchable_keyword(text: str) -> str:
-    """Extract searchable keyword from text (phone, account, or URL)"""
-    # Try phone number first
-    if is_phone_number(text):
-        return re.sub(r'[\s\-\.]', '', text.strip())
-    
-    # Try bank account
-    if is_bank_account(text):
-        return text.strip()
-    
-    # Try URL
-    url_match = re.search(r'https?://([^\s]+)|www\.([^\s]+)|([^\s]+\.(com|vn|org|net|io|me|edu|gov))', text.lower())
-    if url_match:
-        # Extract domain or full URL
-        for group in url_match.groups():
-            if group:
-                return group.split('/')[0]  # Get domain only
+
+def schedule_deferred_result(user_id: str, keyword: str, delay: int):
+    task = asyncio.ensure_future(send_deferred_result(user_id, keyword, delay))
+    deferred_replies.add(task)
+    task.add_done_callback(deferred_replies.discard)
+
+
+async def send_deferred_result(user_id: str, keyword: str, delay: int):
+    """Repeat a shed or partial search after ``delay`` and send the result"""
+    response_text = """😔 Xin lỗi, hệ thống vẫn đang quá tải.
+Vui lòng gửi lại yêu cầu sau ít phút."""
+    for _ in range(settings.ZALO_DEFERRED_REPLY_ATTEMPTS):
+        await asyncio.sleep(delay)
+        search_result = await crawler_service.search_all_sources(keyword, priority="interactive")
+        retry_after = crawler_service.shed_retry_after(search_result)
+        if retry_after is None:
+            response_text = await format_scam_results_for_zalo(search_result, keyword)
+            break
+        delay = retry_after
     
-    return text.strip()
+    db = SessionLocal()
+    try:
+        await zalo_service.send_text_message(user_id, response_text)
+        db.add(ZaloMessage(
+            zalo_user_id=user_id,
+            message_type="text",
+            message_content=response_text,
+            is_from_user=False
+        ))
+        db.commit()
+    except Exception as e:
+        print(f"Deferred reply error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
 
+def format_incomplete_note(results: dict, follow_up: bool = False) -> str:
+    """Which sources didn't answer (shed, timed out, unavailable, failed)"""
+    missing = [
+        source.get("source", "")
+        for source in results.get("sources", [])
+        if not (source.get("success") and source.get("status", "complete") == "complete")
+    ]
+    if not missing:
+        return ""
+    note = f"⏳ Chưa kiểm tra được: {', '.join(missing)}\n"
+    if follow_up:
+        return note + "Tôi sẽ gửi kết quả đầy đủ trong ít phút nữa.\n"
+    return note + "Vui lòng kiểm tra lại sau ít phút.\n"
 
-async def format_scam_results_for_zalo(results: dict, keyword: str) -> str:
-    """Format scam search results for Zalo message with link"""
+
+async def format_scam_results_for_zalo(results: dict, keyword: str, follow_up: bool = False) -> str:
+    """Format scam search results for Zalo message with link
+    
+    Sources that didn't answer are listed, so an empty partial result is
+    never reported as "no warnings found".
+    """
     
     # Generate checkscam link
     checkscam_link = f"https://thuatnguyen.io.vn/scam-search?keyword={keyword}"
+    incomplete_note = format_incomplete_note(results, follow_up)
+    
+    if results.get("total_results", 0) == 0 and incomplete_note:
+        return f"""⚠️ CHƯA ĐỦ DỮ LIỆU
+
+Từ khóa: {keyword}
+Chưa thấy báo cáo ở các nguồn đã kiểm tra: {', '.join(results.get("complete_sources", [])) or "không có"}
+{incomplete_note}
+⚠️ Chưa kiểm tra hết ≠ An toàn
+Luôn cẩn thận khi giao dịch tiền bạc!
+
+🔍 Xem chi tiết: {checkscam_link}"""
     
     if results.get("total_results", 0) == 0:
         return f"""✅ KHÔNG TÌM THẤY CẢNH BÁO
@@ -89,8 +159,6 @@ Tổng số báo cáo: {results['total_results']}
     for source in results.get("sources", []):
         if source.get("success") and source.get("data"):
             total = source.get("total_scams", 0)
-            if isinstance(total, str) and total.isdigit():
-                total = int(total)
             
             if total > 0:
                 has_results = True
@@ -115,6 +183,9 @@ Tổng số báo cáo: {results['total_results']}
         message += f"ℹ️ Có dữ liệu nhưng chưa có báo cáo cụ thể\n"
         message += f"🔍 Kiểm tra thêm: {checkscam_link}"
     
+    if incomplete_note:
+        message += f"\n\n{incomplete_note}"
+    
     return message
 
 
@@ -209,7 +280,7 @@ Gõ /help để xem hướng dẫn này."""
             keyword = extract_searchable_keyword(message_text)
             
             # Send checking message first
-            checking_msg = f"⏳ Đang kiểm tra số điện thoại: {keyword}\n\nVui lòng đợi trong giây lát..."
+            checking_msg = f"⏳ Đang kiểm tra số điện thoại: {keyword}\n\n{format_preliminary_verdict(keyword)}Vui lòng đợi trong giây lát..."
             await zalo_service.send_text_message(user_id, checking_msg)
             
             # Save checking message
@@ -223,15 +294,14 @@ Gõ /help để xem hướng dẫn này."""
             db.commit()
             
             # Do actual search (keyword already extracted)
-            search_result = await crawler_service.search_all_sources(keyword)
-            response_text = await format_scam_results_for_zalo(search_result, keyword)
+            response_text = await search_for_zalo(user_id, keyword)
             
         elif is_bank_account(message_text):
             # Extract and search bank account
             keyword = extract_searchable_keyword(message_text)
             
             # Send checking message first
-            checking_msg = f"⏳ Đang kiểm tra số tài khoản: {keyword}\n\nVui lòng đợi trong giây lát..."
+            checking_msg = f"⏳ Đang kiểm tra số tài khoản: {keyword}\n\n{format_preliminary_verdict(keyword)}Vui lòng đợi trong giây lát..."
             await zalo_service.send_text_message(user_id, checking_msg)
             
             # Save checking message
@@ -245,8 +315,7 @@ Gõ /help để xem hướng dẫn này."""
             db.commit()
             
             # Extract keyword again for consistency
-            search_result = await crawler_service.search_all_sources(keyword)
-            response_text = await format_scam_results_for_zalo(search_result, keyword)
+            response_text = await search_for_zalo(user_id, keyword)
             
         elif is_url(message_text):
             # Search URL/domain
@@ -267,8 +336,7 @@ Gõ /help để xem hướng dẫn này."""
             db.commit()
             
             # Extract keyword for consistency
-            search_result = await crawler_service.search_all_sources(keyword)
-            response_text = await format_scam_results_for_zalo(search_result, keyword)
+            response_text = await search_for_zalo(user_id, keyword)
             
         else:
             # AI chat
@@ -1,6 +1,6 @@
 """Application configuration"""
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Dict
 
 
 class Settings(BaseSettings):
@@ -19,6 +19,30 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     CACHE_TTL: int = 3600  # 1 hour
+    SCAM_SOURCE_CACHE_TTLS: Dict[str, int] = {
+        "admin": 3600,
+        "checkscam": 3600,
+        "scam": 3600,
+        "chongluadao": 1800,
+    }
+    SCAM_SOURCE_EMPTY_CACHE_TTLS: Dict[str, int] = {  # results with zero reports
+        "admin": 900,
+        "checkscam": 900,
+        "scam": 900,
+        "chongluadao": 600,
+    }
+    SCAM_CACHE_STALE_WINDOW: int = 86400  # serve stale (and refresh) this long past the TTL
+    SCAM_CACHE_ADAPTIVE_TTL: bool = True  # grow TTL while refreshes return identical data
+    SCAM_CACHE_TTL_GROWTH: float = 2.0
+    SCAM_CACHE_TTL_SHRINK: float = 0.5
+    SCAM_CACHE_MIN_TTL: int = 300
+    SCAM_CACHE_MAX_TTL: int = 86400
+    # Cache values are msgpack, compressed from this size ("zstd", "zlib" or
+    # "none"; zstd falls back to zlib when zstandard isn't installed)
+    CACHE_COMPRESSION: str = "zstd"
+    CACHE_COMPRESS_MIN_BYTES: int = 512
+    CACHE_ZSTD_LEVEL: int = 3
+    CACHE_ZLIB_LEVEL: int = 6
     
     # Security
     API_SECRET_KEY: str = "your-secret-key-change-this"
@@ -51,8 +75,139 @@ class Settings(BaseSettings):
     
     # Selenium
     SELENIUM_HEADLESS: bool = True
-    SELENIUM_TIMEOUT: int = 30
+    SELENIUM_TIMEOUT: int = 30  # upper bound for any readiness wait
+    SELENIUM_POOL_SIZE: int = 3
+    SELENIUM_POOL_PREWARM: bool = True
+    SELENIUM_POOL_ACQUIRE_TIMEOUT: int = 30
+    SELENIUM_POOL_MAX_PAGES: int = 50  # recycle a driver after N page loads
+    SELENIUM_POOL_MAX_MEMORY_MB: int = 600  # recycle when Chrome RSS exceeds this (0 = off)
+    SELENIUM_READY_TIMEOUT: float = 15.0  # hard deadline for a page to become ready
+    SELENIUM_READY_POLL_INTERVAL: float = 0.1
+    # Lean scraping profile: blocked resource types per source (image, font,
+    # stylesheet, media, tracker), plus no extensions/background networking
+    SELENIUM_BLOCK_RESOURCES: bool = True
+    SELENIUM_BLOCKED_RESOURCES: Dict[str, List[str]] = {
+        "admin.vn": ["image", "font", "stylesheet", "media", "tracker"],
+        "checkscam.vn": ["image", "font", "stylesheet", "media", "tracker"],
+        "scam.vn": ["image", "font", "media", "tracker"],
+    }
+    # Parse the search XHR's response (performance log) instead of waiting
+    # for the DOM: URL substrings identifying the search request per source
+    SELENIUM_XHR_CAPTURE: Dict[str, List[str]] = {
+        "scam.vn": ["tim-kiem", "search"],
+    }
     
+    # Result page parsing: tree builder ("lxml" or "html.parser"), and pages
+    # of at least this many characters are parsed in a process pool (0 = off).
+    # Result pages run 30-110 KB (~50-170 ms of GIL-holding parse in a
+    # thread); the pool round trip adds ~1 ms, so only tiny pages stay inline
+    HTML_PARSER: str = "lxml"
+    HTML_PARSE_PROCESS_THRESHOLD: int = 32_000
+    HTML_PARSE_PROCESSES: int = 2
+    
+    # Direct HTTP fetch engine (falls back to Selenium when no result markers)
+    HTTP_FETCH_ENABLED: bool = True
+    HTTP_FETCH_TIMEOUT: float = 5.0
+    
+    # Search deadlines (seconds); late sources keep running to fill the cache
+    SEARCH_TOTAL_BUDGET: float = 12.0
+    SEARCH_SOURCE_BUDGETS: Dict[str, float] = {
+        "admin": 10.0,
+        "checkscam": 10.0,
+        "scam": 10.0,
+        "chongluadao": 5.0,
+    }
+    
+    # Single-flight coalescing of identical crawls across workers
+    SINGLE_FLIGHT_LOCK_TTL: int = 60  # must outlast the slowest crawl
+    
+    # Crawl execution: "inline" crawls in the API process, "queue" hands
+    # crawls to worker processes (python -m app.worker) over a Redis stream
+    CRAWL_MODE: str = "inline"
+    CRAWL_STREAM: str = "scam:crawl:stream"  # prefix; one stream per priority class
+    CRAWL_GROUP: str = "crawlers"
+    CRAWL_DEAD_LETTER_STREAM: str = "scam:crawl:dead"
+    CRAWL_STREAM_MAXLEN: int = 10000
+    CRAWL_QUEUE_RESULT_TIMEOUT: int = 60  # how long the API waits for a worker
+    CRAWL_QUEUE_CLAIM_IDLE_MS: int = 90000  # reclaim jobs unacked this long (> slowest crawl)
+    CRAWL_QUEUE_MAX_DELIVERIES: int = 3
+    CRAWL_WORKER_CONCURRENCY: int = 3  # crawls per worker process
+    
+    # Priority classes sharing Chrome capacity: interactive (Zalo), web,
+    # bulk, prefetch. Higher weight = larger share when classes compete.
+    CRAWL_PRIORITY_WEIGHTS: Dict[str, float] = {
+        "interactive": 8,
+        "web": 4,
+        "bulk": 2,
+        "prefetch": 1,
+    }
+    CRAWL_RESERVED_INTERACTIVE_SLOTS: int = 1  # never given to bulk/prefetch
+    
+    # Admission control: a user-facing crawl is shed instead of queued once
+    # this many crawls are already waiting (bulk/prefetch always wait)
+    ADMISSION_QUEUE_LIMITS: Dict[str, int] = {
+        "interactive": 12,
+        "web": 6,
+    }
+    ADMISSION_EST_CRAWL_SECONDS: float = 8.0  # for the Retry-After estimate
+    ZALO_DEFERRED_REPLY_ATTEMPTS: int = 3  # retries before telling a Zalo user to resend
+    
+    # Per-source rate limits (requests/second across all processes) and
+    # circuit breakers for the scrape targets
+    SOURCE_RATE_LIMITS: Dict[str, float] = {
+        "admin": 2.0,
+        "checkscam": 2.0,
+        "scam": 1.0,
+        "chongluadao": 5.0,
+    }
+    SOURCE_RATE_BURST: Dict[str, int] = {
+        "admin": 5,
+        "checkscam": 5,
+        "scam": 3,
+        "chongluadao": 10,
+    }
+    SOURCE_RATE_LIMIT_MAX_WAIT: float = 2.0  # wait this long for a token, then give up
+    SOURCE_BREAKER_FAILURES: int = 5  # consecutive failures/slow crawls that open the breaker
+    SOURCE_BREAKER_COOLDOWN: int = 60  # seconds open before a half-open probe
+    SOURCE_BREAKER_PROBE_TTL: int = 30  # a probe that never reports is retried after this
+    
+    # Bulk keyword lookup
+    BULK_SEARCH_MAX_KEYWORDS: int = 500
+    BULK_CRAWL_CONCURRENCY: int = 4  # keywords crawled at once per bulk request
+    
+    # Asynchronous search jobs
+    SEARCH_JOB_TTL: int = 3600  # how long job state stays readable
+    SEARCH_JOB_STREAM_TIMEOUT: int = 120  # max seconds an SSE subscriber waits
+    
+    # Background mirror of source listing pages into the local scam index
+    MIRROR_ENABLED: bool = False
+    MIRROR_INTERVAL: int = 1800  # seconds between mirror runs
+    MIRROR_MAX_PAGES: int = 20  # per source per run (first run backfills this deep)
+    MIRROR_PAGE_DELAY: float = 2.0  # pause between page fetches on one source
+    MIRROR_WATERMARK_SIZE: int = 20  # newest record keys remembered per source
+    MIRROR_LISTING_URLS: Dict[str, str] = {
+        "admin.vn": "https://admin.vn/scams?page={page}",
+        "checkscam.vn": "https://checkscam.vn/page/{page}/",
+        "scam.vn": "https://scam.vn/?page={page}",
+    }
+    
+    # Cache warm-up of hot keywords from search history
+    PREFETCH_ENABLED: bool = False
+    PREFETCH_INTERVAL: int = 300  # seconds between runs
+    PREFETCH_FREQUENT_WINDOW: int = 7 * 86400
+    PREFETCH_TRENDING_WINDOW: int = 3600
+    PREFETCH_MIN_SEARCHES: int = 5  # in the frequent window
+    PREFETCH_TRENDING_MIN_SEARCHES: int = 3  # in the trending window
+    PREFETCH_TRENDING_LIFT: float = 3.0  # short-window rate vs long-window rate
+    PREFETCH_MAX_KEYWORDS: int = 200
+    PREFETCH_LEAD_TIME: int = 600  # refresh entries this close to soft expiry (at most half their TTL)
+    PREFETCH_CRAWL_BUDGET: int = 60  # source crawls per run
+    PREFETCH_CONCURRENCY: int = 2
+    
+    # In-process index of reported phones/accounts for instant verdicts
+    KNOWN_BAD_RELOAD_INTERVAL: int = 60  # incremental top-up
+    KNOWN_BAD_FULL_RELOAD_INTERVAL: int = 3600  # full rebuild drops deleted reports
+
     class Config:
         env_file = ".env"
         case_sensitive = True
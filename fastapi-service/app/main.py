@@ -4,12 +4,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
 import time
 import os
 from .config import settings
 from .api.v1.api import api_router
 from .database import engine, Base
-from .services import cache_service
+from .services import cache_service, crawler_service
+from .services.mirror_crawler import mirror_crawler
+from .services.known_bad_index import known_bad_index
+from .services.prefetch import prefetch_scheduler
 from .schemas import HealthCheckResponse, APIResponse
 from datetime import datetime
 
@@ -28,10 +32,38 @@ async def lifespan(app: FastAPI):
     await cache_service.connect()
     print("✅ Redis connected")
     
+    # Warm the Chrome driver pool without blocking startup
+    warmup_task = asyncio.create_task(crawler_service.start())
+    
+    # Load reported phones/accounts for instant verdicts
+    known_bad_task = asyncio.create_task(known_bad_index.start_scheduler())
+    
+    # Mirror source listings into the local scam index
+    mirror_task = None
+    if settings.MIRROR_ENABLED:
+        mirror_task = asyncio.create_task(mirror_crawler.start_scheduler())
+        print("✅ Mirror crawler started")
+    
+    # Keep hot keywords' cache entries warm
+    prefetch_task = None
+    if settings.PREFETCH_ENABLED:
+        prefetch_task = asyncio.create_task(prefetch_scheduler.start_scheduler())
+        print("✅ Prefetch scheduler started")
+    
     yield
     
     # Shutdown
     print("👋 Shutting down...")
+    warmup_task.cancel()
+    known_bad_index.stop_scheduler()
+    known_bad_task.cancel()
+    if prefetch_task:
+        prefetch_scheduler.stop_scheduler()
+        prefetch_task.cancel()
+    if mirror_task:
+        mirror_crawler.stop_scheduler()
+        mirror_task.cancel()
+    await crawler_service.shutdown()
     await cache_service.close()
 
 
@@ -103,6 +103,25 @@ class ScamCache(Base):
     hit_count = Column(Integer, default=0)
 
 
+class ScamRecord(Base):
+    """Normalized scam record collected by the crawlers"""
+    __tablename__ = "scam_records"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    record_key = Column(String(64), unique=True, nullable=False)  # sha1 of source + identity
+    source = Column(String(50), nullable=False, index=True)  # 'admin.vn', 'checkscam.vn', ...
+    name = Column(String(255))
+    phone = Column(String(50))
+    phone_canonical = Column(String(20), index=True)
+    account_number = Column(String(50))
+    account_canonical = Column(String(32), index=True)
+    bank = Column(String(255))
+    amount = Column(String(100))
+    detail_link = Column(String(500))
+    data = Column(JSON)  # raw record as returned by the crawler
+    first_seen = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
 
 class ZaloUser(Base):
     __tablename__ = "zalo_users"
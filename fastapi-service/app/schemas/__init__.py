@@ -10,12 +10,25 @@ class ScamSearchRequest(BaseModel):
     type: Optional[str] = Field(None, description="admin, checkscam, chongluadao, or all")
 
 
+class ScamBulkSearchRequest(BaseModel):
+    keywords: List[str] = Field(..., min_length=1, description="Phone numbers, accounts, or names")
+    type: Optional[str] = Field(None, pattern="^(admin|checkscam|scam|chongluadao|all)$")
+
+
 class ScamSearchResponse(BaseModel):
     success: bool
     keyword: str
     total_results: int
     sources: List[Dict[str, Any]]
+    complete_sources: List[str] = []
+    timed_out_sources: List[str] = []
+    shed_sources: List[str] = []
+    unavailable_sources: List[str] = []
+    partial: bool = False
     cached: bool = False
+    stale: bool = False
+    from_index: bool = False
+    preliminary_verdict: Optional[Dict[str, Any]] = None
     response_time_ms: Optional[int] = None
 
 
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of result page parsing: the old html.parser tree vs each
+available backend, in-process and through the parse process pool
+Usage: python -m app.scripts.benchmark_parsers [--rows 200] [--runs 20] [source=page.html ...]
+
+Without page files, synthetic pages with --rows results are generated.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from app.services.parsers import (
+    PARSERS, HAS_LXML, _parse_page, get_process_pool, parser_backend, shutdown_process_pool
+)
+
+
+FILLER = "<div class='sidebar'>" + "<p><a href='/tin-tuc/{i}'>Tin tức {i}</a> <span>lượt xem</span></p>" * 40 + "</div>"
+
+
+def synthetic_page(source: str, rows: int) -> str:
+    """A search result page shaped like the source's markup"""
+    if source == 'admin.vn':
+        body = "<div class='alert alert-danger text-center'><strong>%d</strong> <strong>0123456789</strong></div>" % rows
+        body += "".join(
+            "<div class='scam-card'>"
+            + "".join(f"<div class='scam-column'><div class='limit'>Col {c} {i}</div></div>" for c in range(7))
+            + f"<a class='stretched-link' href='/scam/{i}'></a></div>"
+            for i in range(rows)
+        )
+    elif source == 'checkscam.vn':
+        body = f"<h2 class='h1'>Có {rows} cảnh báo \"0123456789\"</h2>"
+        body += "".join(
+            f"<div class='ct'><div class='ct1'><a href='/c/{i}'>Cảnh báo {i}</a></div>"
+            f"<div class='ct2'><span>Lượt xem {i}</span><span>12 tháng 3...</span></div></div>"
+            for i in range(rows)
+        )
+    else:
+        body = "<table class='table'>" + "".join(
+            f"<tr class='rs'><td>{i}</td><td><a href='/s/{i}'>Tên {i}</a></td>"
+            "<td><div class='sotaikhoan'><span class='hidden-info' data-type='tknganhang' data-value='0123'></span></div>"
+            "<div class='tennganhang'><span class='badge'>VCB</span></div></td></tr>"
+            for i in range(rows)
+        ) + "</table>"
+    filler = FILLER.replace("{i}", "x")
+    return f"<html><head><title>{source}</title></head><body>{filler}{body}{filler}</body></html>"
+
+
+def time_parse(parse, runs: int) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        parse()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('pages', nargs='*', help='source=path of a saved result page')
+    args = parser.parse_args()
+
+    pages = {}
+    for item in args.pages:
+        source, path = item.split('=', 1)
+        with open(path, encoding='utf-8') as f:
+            pages[source] = f.read()
+    if not pages:
+        pages = {source: synthetic_page(source, args.rows) for source in PARSERS}
+
+    backends = ['html.parser'] + (['lxml'] if HAS_LXML else [])
+    if not HAS_LXML:
+        print("lxml is not installed; only html.parser is measured", file=sys.stderr)
+
+    print(f"{'source':<14}{'KB':>7}  {'variant':<26}{'ms/page':>9}{'speedup':>9}")
+    for source, html in pages.items():
+        parse = PARSERS[source]
+        baseline_result = parse(BeautifulSoup(html, 'html.parser'), '0123456789')
+        baseline = time_parse(lambda: parse(BeautifulSoup(html, 'html.parser'), '0123456789'), args.runs)
+        print(f"{source:<14}{len(html) // 1024:>7}  {'html.parser (before)':<26}{baseline:>9.2f}{'1.0x':>9}")
+
+        for backend in backends:
+            variants = {}
+            if backend != 'html.parser':
+                variants[backend] = lambda: parse(BeautifulSoup(html, backend), '0123456789')
+            if backend == parser_backend():
+                # Includes pickling the page and result across processes
+                variants[f"{backend} (process pool)"] = lambda: get_process_pool().submit(
+                    _parse_page, source, html, '0123456789', False
+                ).result()
+            for name, run in variants.items():
+                if run()['data'] != baseline_result['data']:
+                    print(f"  ! {name} disagrees with the baseline", file=sys.stderr)
+                ms = time_parse(run, args.runs)
+                print(f"{'':<14}{'':>7}  {name:<26}{ms:>9.2f}{baseline / ms:>8.1f}x")
+
+    shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 """Redis cache service"""
 from redis import asyncio as aioredis
 import json
-from typing import Optional, Any
+import time
+from typing import Optional, Any, Dict, List, Tuple
 from datetime import datetime, timedelta
 from ..config import settings
+from .keywords import normalize_keyword
+from .cache_policy import cache_ttl_policy
+from .records import normalize_result, cache_entry_to_row, cache_entry_from_row
+from . import cache_codec
 
 
 class CacheService:
@@ -11,6 +16,7 @@ class CacheService:
     
     def __init__(self):
         self.redis: Optional[aioredis.Redis] = None
+        self.binary: Optional[aioredis.Redis] = None  # for codec-encoded values
     
     async def connect(self):
         """Connect to Redis"""
@@ -20,18 +26,22 @@ class CacheService:
                 encoding="utf-8",
                 decode_responses=True
             )
+        if not self.binary:
+            self.binary = await aioredis.from_url(settings.REDIS_URL)
     
     async def close(self):
         """Close Redis connection"""
         if self.redis:
             await self.redis.close()
+        if self.binary:
+            await self.binary.close()
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         try:
             await self.connect()
-            data = await self.redis.get(key)
-            return json.loads(data) if data else None
+            data = await self.binary.get(key)
+            return cache_codec.decode(data) if data else None
         except Exception as e:
             print(f"Cache get error: {e}")
             return None
@@ -41,8 +51,7 @@ class CacheService:
         try:
             await self.connect()
             ttl = ttl or settings.CACHE_TTL
-            serialized = json.dumps(value, ensure_ascii=False)
-            await self.redis.setex(key, ttl, serialized)
+            await self.binary.setex(key, ttl, cache_codec.encode(value))
             return True
         except Exception as e:
             print(f"Cache set error: {e}")
@@ -73,15 +82,127 @@ class CacheService:
             print(f"Cache clear error: {e}")
             return 0
     
-    async def get_scam_search(self, keyword: str, source: str = "all") -> Optional[dict]:
-        """Get cached scam search result"""
-        key = f"scam:search:{source}:{keyword}"
-        return await self.get(key)
+    def scam_source_key(self, keyword: str, source: str) -> str:
+        """Cache key for one source's result for a keyword"""
+        return f"scam:search:src:{source}:{normalize_keyword(keyword)}"
     
-    async def set_scam_search(self, keyword: str, data: dict, source: str = "all", ttl: int = None) -> bool:
-        """Cache scam search result"""
-        key = f"scam:search:{source}:{keyword}"
-        return await self.set(key, data, ttl)
+    async def get_scam_sources(self, keyword: str, sources: List[str]) -> Dict[str, dict]:
+        """Get cached per-source entries for a keyword (single MGET)
+        
+        Each entry is ``{"data": result, "fresh_until": ts, "stored_at": ts,
+        "stale": bool}``. Stale entries are past their soft TTL but still
+        inside the stale window.
+        """
+        entries = await self.get_scam_sources_many([keyword], sources)
+        return entries[keyword]
+    
+    async def get_scam_sources_many(self, keywords: List[str], sources: List[str]) -> Dict[str, Dict[str, dict]]:
+        """Get cached per-source entries for many keywords in one MGET
+        
+        Returns ``{keyword: {source: entry}}`` with entries shaped as in
+        ``get_scam_sources``.
+        """
+        pairs = [(keyword, source) for keyword in keywords for source in sources]
+        try:
+            await self.connect()
+            payloads = await self.binary.mget([self.scam_source_key(keyword, source) for keyword, source in pairs])
+        except Exception as e:
+            print(f"Cache mget error: {e}")
+            payloads = [None] * len(pairs)
+        now = time.time()
+        
+        entries = {keyword: {} for keyword in keywords}
+        for (keyword, source), payload in zip(pairs, payloads):
+            value = self.decode_scam_source(payload)
+            if not value:
+                continue
+            value["stale"] = now >= value["fresh_until"]
+            entries[keyword][source] = value
+        return entries
+    
+    def decode_scam_source(self, payload: Optional[bytes]) -> Optional[dict]:
+        """Decode a per-source entry: a codec-encoded row, or a legacy JSON dict"""
+        if not payload:
+            return None
+        try:
+            if cache_codec.is_encoded(payload):
+                return cache_entry_from_row(cache_codec.decode(payload))
+            
+            value = json.loads(payload)
+            if "fresh_until" not in value:
+                # Entry written before soft expiry existed: serve it, but refresh
+                value = {"data": value, "fresh_until": 0, "stored_at": 0}
+            value["data"] = normalize_result(value["data"])
+            return value
+        except Exception as e:
+            print(f"Cache decode error: {e}")
+            return None
+    
+    async def set_scam_source(self, keyword: str, source: str, data: dict) -> bool:
+        """Cache one source's result
+        
+        The soft TTL comes from the cache TTL policy (empty vs non-empty
+        results, adapted to how often the data changes); the key itself lives
+        for another SCAM_CACHE_STALE_WINDOW seconds so it can be served stale
+        while it is refreshed.
+        """
+        key = self.scam_source_key(keyword, source)
+        try:
+            await self.connect()
+            previous = None
+            if settings.SCAM_CACHE_ADAPTIVE_TTL:
+                previous = self.decode_scam_source(await self.binary.get(key))
+            soft_ttl, fingerprint = cache_ttl_policy.ttl_for(source, data, previous)
+            now = time.time()
+            entry = {
+                "data": data,
+                "fresh_until": now + soft_ttl,
+                "stored_at": now,
+                "ttl": soft_ttl,
+                "hash": fingerprint,
+            }
+            await self.binary.setex(key, soft_ttl + settings.SCAM_CACHE_STALE_WINDOW, cache_codec.encode(cache_entry_to_row(entry)))
+            return True
+        except Exception as e:
+            print(f"Cache set error: {e}")
+            return False
+    
+    async def mark_refreshing(self, keyword: str, source: str, ttl: int) -> bool:
+        """Claim the background refresh of a stale entry (one worker wins)"""
+        try:
+            await self.connect()
+            key = f"{self.scam_source_key(keyword, source)}:refreshing"
+            return bool(await self.redis.set(key, 1, nx=True, ex=ttl))
+        except Exception as e:
+            print(f"Cache refresh mark error: {e}")
+            return False
+    
+    async def mark_refreshing_many(self, pairs: List[Tuple[str, str]], ttl: int) -> List[bool]:
+        """Claim several (keyword, source) refreshes in one round trip"""
+        if not pairs:
+            return []
+        try:
+            await self.connect()
+            pipe = self.redis.pipeline(transaction=False)
+            for keyword, source in pairs:
+                pipe.set(f"{self.scam_source_key(keyword, source)}:refreshing", 1, nx=True, ex=ttl)
+            return [bool(claimed) for claimed in await pipe.execute()]
+        except Exception as e:
+            print(f"Cache refresh mark error: {e}")
+            return [False] * len(pairs)
+    
+    async def increment_hits(self, keys: List[str]):
+        """Increment several cache hit counters in one round trip"""
+        if not keys:
+            return
+        try:
+            await self.connect()
+            pipe = self.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.incr(f"{key}:hits")
+            await pipe.execute()
+        except Exception as e:
+            print(f"Cache increment error: {e}")
     
     async def increment_hit(self, key: str) -> int:
         """Increment cache hit counter"""
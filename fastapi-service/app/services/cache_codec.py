@@ -0,0 +1,73 @@
+"""Binary encoding of cache values: header, msgpack body, optional compression
+
+Layout: ``MAGIC`` (2 bytes), format version (1 byte), compression (1 byte),
+then the msgpack body, compressed when it is at least
+CACHE_COMPRESS_MIN_BYTES long. Values without the header were written as
+JSON text by older versions and are decoded as such.
+"""
+from typing import Any
+import json
+import zlib
+import msgpack
+from ..config import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+MAGIC = b"SC"
+FORMAT_VERSION = 1
+HEADER_SIZE = 4
+
+RAW, ZSTD, ZLIB = 0, 1, 2
+COMPRESSIONS = {"none": RAW, "zstd": ZSTD, "zlib": ZLIB}
+
+
+class CacheDecodeError(ValueError):
+    pass
+
+
+def _compression() -> int:
+    compression = COMPRESSIONS.get(settings.CACHE_COMPRESSION, RAW)
+    if compression == ZSTD and zstandard is None:
+        return ZLIB
+    return compression
+
+
+def encode(value: Any) -> bytes:
+    """Serialize ``value`` with the cache header"""
+    body = msgpack.packb(value)
+    compression = _compression() if len(body) >= settings.CACHE_COMPRESS_MIN_BYTES else RAW
+
+    if compression == ZSTD:
+        body = zstandard.ZstdCompressor(level=settings.CACHE_ZSTD_LEVEL).compress(body)
+    elif compression == ZLIB:
+        body = zlib.compress(body, settings.CACHE_ZLIB_LEVEL)
+    return MAGIC + bytes((FORMAT_VERSION, compression)) + body
+
+
+def is_encoded(payload: bytes) -> bool:
+    return payload[:2] == MAGIC
+
+
+def decode(payload: bytes) -> Any:
+    """Inverse of ``encode``; headerless payloads are read as legacy JSON"""
+    if not is_encoded(payload):
+        return json.loads(payload)
+
+    version, compression = payload[2], payload[3]
+    if version != FORMAT_VERSION:
+        raise CacheDecodeError(f"unknown cache format version {version}")
+
+    body = payload[HEADER_SIZE:]
+    if compression == ZSTD:
+        if zstandard is None:
+            raise CacheDecodeError("zstd-compressed value but zstandard is not installed")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif compression == ZLIB:
+        body = zlib.decompress(body)
+    elif compression != RAW:
+        raise CacheDecodeError(f"unknown cache compression {compression}")
+    return msgpack.unpackb(body)
@@ -0,0 +1,70 @@
+"""TTL policy for per-source scam search cache entries"""
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+from ..config import settings
+
+
+# Entry fields that identify a report (not views/report_time, which drift)
+FINGERPRINT_FIELDS = ('name', 'phone', 'account_number', 'bank', 'amount', 'detail_link', 'date')
+
+
+class CacheTTLPolicy:
+    """Pick a soft TTL for a freshly crawled source result
+
+    Empty and non-empty results get separate per-source base TTLs. In
+    adaptive mode the TTL grows each time a refresh returns identical data
+    and shrinks when the data changes, so crawl capacity goes to keywords
+    whose data is actually moving.
+    """
+
+    def is_empty(self, data: Dict[str, Any]) -> bool:
+        """True when a source result reports no scams"""
+        if data.get('data'):
+            return False
+        return str(data.get('total_scams', 0)).strip() in ('', '0')
+
+    def fingerprint(self, data: Dict[str, Any]) -> str:
+        """Stable hash of the parts of a result that matter to users
+
+        Only the identity of each report counts; counters such as ``views``
+        change on nearly every crawl and would make every result look new.
+        """
+        entries = [
+            {name: item.get(name, '') for name in FINGERPRINT_FIELDS}
+            for item in data.get('data') or [] if isinstance(item, dict)
+        ]
+        payload = json.dumps(
+            {'total_scams': str(data.get('total_scams', 0)), 'data': entries},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def base_ttl(self, source: str, data: Dict[str, Any]) -> int:
+        if self.is_empty(data):
+            return settings.SCAM_SOURCE_EMPTY_CACHE_TTLS.get(source, settings.CACHE_TTL)
+        return settings.SCAM_SOURCE_CACHE_TTLS.get(source, settings.CACHE_TTL)
+
+    def ttl_for(
+        self,
+        source: str,
+        data: Dict[str, Any],
+        previous: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, str]:
+        """Return (soft TTL, fingerprint) for ``data`` given the previous entry"""
+        fingerprint = self.fingerprint(data)
+        ttl = self.base_ttl(source, data)
+
+        if settings.SCAM_CACHE_ADAPTIVE_TTL and previous and previous.get('ttl'):
+            if previous.get('hash') == fingerprint:
+                ttl = max(ttl, int(previous['ttl'] * settings.SCAM_CACHE_TTL_GROWTH))
+            else:
+                ttl = min(ttl, int(previous['ttl'] * settings.SCAM_CACHE_TTL_SHRINK))
+            ttl = max(settings.SCAM_CACHE_MIN_TTL, min(ttl, settings.SCAM_CACHE_MAX_TTL))
+
+        return ttl, fingerprint
+
+
+# Singleton instance
+cache_ttl_policy = CacheTTLPolicy()
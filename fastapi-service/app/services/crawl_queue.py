@@ -0,0 +1,205 @@
+"""Redis Streams queue between the API and out-of-process crawl workers"""
+from typing import Dict, Any, List, Optional, Tuple
+import json
+import time
+import uuid
+
+from ..config import settings
+from .cache import cache_service
+from .crawl_scheduler import crawl_scheduler, PRIORITIES
+
+
+class CrawlQueue:
+    """Crawl job queue on Redis streams with a consumer group
+
+    Each priority class has its own stream (``{CRAWL_STREAM}:{priority}``);
+    workers drain them in the scheduler's weighted order, interactive first.
+    The API enqueues ``{id, source, keyword}`` (mirror listing renders:
+    ``{id, source, kind=listing, url}``) with XADD and blocks on
+    ``scam:crawl:result:{id}`` (BLPOP) for the answer. Workers read with
+    XREADGROUP, XACK once the result is cached and pushed, and reclaim jobs
+    left pending by a dead worker with XAUTOCLAIM. A job delivered more than
+    CRAWL_QUEUE_MAX_DELIVERIES times is moved to the dead-letter stream.
+    """
+
+    def __init__(self):
+        self._depth = (0.0, 0)
+
+    def result_key(self, job_id: str) -> str:
+        return f"scam:crawl:result:{job_id}"
+
+    def stream(self, priority: str) -> str:
+        return f"{settings.CRAWL_STREAM}:{priority}"
+
+    async def ensure_group(self):
+        """Create the streams and consumer groups if they don't exist yet"""
+        await cache_service.connect()
+        for priority in PRIORITIES:
+            try:
+                await cache_service.redis.xgroup_create(
+                    self.stream(priority), settings.CRAWL_GROUP, id="0", mkstream=True
+                )
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def enqueue(self, source: str, keyword: str, priority: str = 'web', **extra: str) -> str:
+        """Add a crawl job to its priority stream and return its ID"""
+        await cache_service.connect()
+        job_id = uuid.uuid4().hex
+        await cache_service.redis.xadd(
+            self.stream(priority if priority in PRIORITIES else 'web'),
+            {"id": job_id, "source": source, "keyword": keyword, **extra},
+            maxlen=settings.CRAWL_STREAM_MAXLEN,
+            approximate=True,
+        )
+        return job_id
+
+    async def wait_result(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Block until a worker pushes the job's result, or None on timeout"""
+        reply = await cache_service.redis.blpop(self.result_key(job_id), timeout=max(1, int(timeout)))
+        if reply is None:
+            return None
+        return json.loads(reply[1])
+
+    async def crawl(self, source: str, source_name: str, keyword: str, priority: str = 'web') -> Dict[str, Any]:
+        """Hand a crawl to the worker tier and wait for its result"""
+        try:
+            job_id = await self.enqueue(source, keyword, priority)
+            result = await self.wait_result(job_id, settings.CRAWL_QUEUE_RESULT_TIMEOUT)
+        except Exception as e:
+            print(f"Crawl queue error: {e}")
+            return {'success': False, 'source': source_name, 'error': f"Crawl queue unavailable: {e}"}
+
+        if result is None:
+            return {
+                'success': False,
+                'source': source_name,
+                'error': f"No crawl worker answered within {settings.CRAWL_QUEUE_RESULT_TIMEOUT}s"
+            }
+        return result
+
+    async def render_listing(self, source_name: str, url: str) -> Dict[str, Any]:
+        """Have a worker render a mirror listing page (``kind=listing`` job)"""
+        try:
+            job_id = await self.enqueue(source_name, '', 'prefetch', kind='listing', url=url)
+            result = await self.wait_result(job_id, settings.CRAWL_QUEUE_RESULT_TIMEOUT)
+        except Exception as e:
+            print(f"Crawl queue error: {e}")
+            return {'success': False, 'source': source_name, 'error': f"Crawl queue unavailable: {e}"}
+
+        if result is None:
+            return {
+                'success': False,
+                'source': source_name,
+                'error': f"No crawl worker answered within {settings.CRAWL_QUEUE_RESULT_TIMEOUT}s"
+            }
+        return result
+
+    async def push_result(self, job_id: str, result: Dict[str, Any]):
+        """Hand a finished result back to the waiting API process"""
+        key = self.result_key(job_id)
+        pipe = cache_service.redis.pipeline()
+        pipe.rpush(key, json.dumps(result, ensure_ascii=False))
+        pipe.expire(key, settings.CRAWL_QUEUE_RESULT_TIMEOUT)
+        await pipe.execute()
+
+    async def read(self, consumer: str, count: int, block_ms: int) -> List[Tuple[str, str, Dict[str, str]]]:
+        """Read new ``(priority, message_id, fields)`` jobs for this consumer
+
+        Streams are polled in the scheduler's order and the first class with
+        work is served; when all are empty, block on all of them at once.
+        """
+        for priority in crawl_scheduler.order():
+            response = await cache_service.redis.xreadgroup(
+                settings.CRAWL_GROUP, consumer, {self.stream(priority): ">"}, count=count
+            )
+            if response:
+                return [(priority, message_id, fields) for message_id, fields in response[0][1]]
+
+        response = await cache_service.redis.xreadgroup(
+            settings.CRAWL_GROUP, consumer, {self.stream(p): ">" for p in PRIORITIES},
+            count=1, block=block_ms
+        )
+        by_stream = {self.stream(p): p for p in PRIORITIES}
+        return [
+            (by_stream[stream], message_id, fields)
+            for stream, messages in (response or [])
+            for message_id, fields in messages
+        ]
+
+    async def claim_stale(self, consumer: str, count: int) -> List[Tuple[str, str, Dict[str, str]]]:
+        """Take over jobs left unacknowledged by a crashed or stuck worker"""
+        for priority in PRIORITIES:
+            response = await cache_service.redis.xautoclaim(
+                self.stream(priority), settings.CRAWL_GROUP, consumer,
+                min_idle_time=settings.CRAWL_QUEUE_CLAIM_IDLE_MS, start_id="0-0", count=count
+            )
+            messages = [message for message in response[1] if message and message[1]]
+            if messages:
+                return [(priority, message_id, fields) for message_id, fields in messages]
+        return []
+
+    async def delivery_count(self, priority: str, message_id: str) -> int:
+        pending = await cache_service.redis.xpending_range(
+            self.stream(priority), settings.CRAWL_GROUP, min=message_id, max=message_id, count=1
+        )
+        return pending[0]["times_delivered"] if pending else 1
+
+    async def ack(self, priority: str, message_id: str):
+        await cache_service.redis.xack(self.stream(priority), settings.CRAWL_GROUP, message_id)
+
+    async def dead_letter(self, priority: str, message_id: str, fields: Dict[str, str], error: str):
+        """Move a job that keeps failing to the dead-letter stream"""
+        await cache_service.redis.xadd(
+            settings.CRAWL_DEAD_LETTER_STREAM,
+            {**fields, "priority": priority, "message_id": message_id, "error": error},
+            maxlen=settings.CRAWL_STREAM_MAXLEN,
+            approximate=True,
+        )
+        await self.ack(priority, message_id)
+
+    async def depth(self) -> int:
+        """Jobs not yet picked up by any worker (cached for a second)"""
+        checked_at, depth = self._depth
+        if time.monotonic() - checked_at < 1.0:
+            return depth
+
+        await cache_service.connect()
+        depth = 0
+        for priority in PRIORITIES:
+            try:
+                groups = await cache_service.redis.xinfo_groups(self.stream(priority))
+            except Exception:
+                continue
+            group = next((g for g in groups if g["name"] == settings.CRAWL_GROUP), {})
+            depth += group.get("lag") or 0
+        self._depth = (time.monotonic(), depth)
+        return depth
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Per-class stream length and pending jobs, plus consumers"""
+        await cache_service.connect()
+        classes = {}
+        consumers = 0
+        try:
+            for priority in PRIORITIES:
+                length = await cache_service.redis.xlen(self.stream(priority))
+                groups = await cache_service.redis.xinfo_groups(self.stream(priority)) if length else []
+                group = next((g for g in groups if g["name"] == settings.CRAWL_GROUP), {})
+                consumers = max(consumers, group.get("consumers", 0))
+                classes[priority] = {"stream_length": length, "pending": group.get("pending", 0)}
+            dead = await cache_service.redis.xlen(settings.CRAWL_DEAD_LETTER_STREAM)
+        except Exception as e:
+            return {"mode": settings.CRAWL_MODE, "error": str(e)}
+
+        return {
+            "mode": settings.CRAWL_MODE,
+            "classes": classes,
+            "consumers": consumers,
+            "dead_letters": dead,
+        }
+
+
+# Singleton instance
+crawl_queue = CrawlQueue()
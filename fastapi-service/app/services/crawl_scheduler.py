@@ -0,0 +1,156 @@
+"""Priority scheduling of crawl capacity between interactive and background work"""
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Deque, List, Optional
+import asyncio
+import math
+
+from ..config import settings
+
+
+# Highest priority first
+PRIORITIES = ('interactive', 'web', 'bulk', 'prefetch')
+BACKGROUND_PRIORITIES = ('bulk', 'prefetch')
+
+
+class CrawlScheduler:
+    """Weighted fair queueing of crawl slots across priority classes
+
+    A crawl holds one of ``slots`` (one per Chrome driver) while it runs.
+    When a slot frees up it goes to the waiting class with the lowest
+    served/weight ratio (CRAWL_PRIORITY_WEIGHTS), except that waiting
+    interactive crawls always go first and bulk/prefetch crawls never take
+    the last CRAWL_RESERVED_INTERACTIVE_SLOTS slots, so a user waiting on
+    the Zalo bot is not stuck behind a bulk job.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self.in_use = 0
+        self.waiting: Dict[str, Deque[asyncio.Future]] = {p: deque() for p in PRIORITIES}
+        self.running: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self.served: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        # Count work when a slot is granted; off where work is counted as it
+        # is dequeued instead (the crawl worker), so nothing counts twice
+        self.record_slots = True
+
+    def weight(self, priority: str) -> float:
+        return settings.CRAWL_PRIORITY_WEIGHTS.get(priority, 1)
+
+    def order(self, candidates: Optional[List[str]] = None) -> List[str]:
+        """Classes in the order they should be served next"""
+        candidates = candidates if candidates is not None else list(PRIORITIES)
+        rest = sorted(
+            (p for p in candidates if p != 'interactive'),
+            key=lambda p: (self.served[p] / self.weight(p), PRIORITIES.index(p))
+        )
+        return (['interactive'] if 'interactive' in candidates else []) + rest
+
+    def record(self, priority: str):
+        """Count one unit of work served to ``priority``"""
+        self.served[priority] += 1
+
+    def _can_start(self, priority: str) -> bool:
+        free = self.slots - self.in_use
+        if free <= 0:
+            return False
+        if priority in BACKGROUND_PRIORITIES:
+            return free > min(settings.CRAWL_RESERVED_INTERACTIVE_SLOTS, self.slots - 1)
+        return True
+
+    def _dispatch(self):
+        """Hand free slots to waiters in priority/fairness order"""
+        while self.in_use < self.slots:
+            waiting = [p for p in PRIORITIES if self.waiting[p]]
+            if not waiting:
+                return
+            # Background classes wait while a user-facing crawl is queued
+            if any(p not in BACKGROUND_PRIORITIES for p in waiting):
+                waiting = [p for p in waiting if p not in BACKGROUND_PRIORITIES]
+
+            for priority in self.order(waiting):
+                if self._can_start(priority):
+                    future = self.waiting[priority].popleft()
+                    if not future.done():
+                        self._start(priority)
+                        future.set_result(True)
+                    break
+            else:
+                return
+
+    def _start(self, priority: str):
+        self.in_use += 1
+        self.running[priority] += 1
+        if self.record_slots:
+            self.record(priority)
+
+    def _finish(self, priority: str):
+        self.in_use -= 1
+        self.running[priority] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: str = 'web'):
+        """Hold a crawl slot for the duration of the block"""
+        if priority not in self.waiting:
+            priority = 'web'
+
+        queued = any(self.waiting[p] for p in PRIORITIES)
+        if not queued and self._can_start(priority):
+            self._start(priority)
+        else:
+            future = asyncio.get_event_loop().create_future()
+            self.waiting[priority].append(future)
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Slot was granted just as we were cancelled
+                    self._finish(priority)
+                elif future in self.waiting[priority]:
+                    self.waiting[priority].remove(future)
+                raise
+
+        try:
+            yield
+        finally:
+            self._finish(priority)
+
+    def queued(self) -> int:
+        """Crawls waiting for a slot"""
+        return sum(len(waiting) for waiting in self.waiting.values())
+
+    def admits(self, priority: str, depth: int) -> bool:
+        """Whether a new crawl of ``priority`` may join a backlog of ``depth``
+
+        Background classes are never shed; they wait for a slot instead.
+        """
+        if priority in BACKGROUND_PRIORITIES:
+            return True
+        return depth < settings.ADMISSION_QUEUE_LIMITS.get(priority, 0)
+
+    def retry_after(self, depth: int) -> int:
+        """Rough seconds until a backlog of ``depth`` crawls drains"""
+        return max(1, math.ceil((depth + 1) / self.slots * settings.ADMISSION_EST_CRAWL_SECONDS))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Slots in use and per-class queue depth"""
+        return {
+            "slots": self.slots,
+            "in_use": self.in_use,
+            "queued": self.queued(),
+            "classes": {
+                p: {
+                    "weight": self.weight(p),
+                    "waiting": len(self.waiting[p]),
+                    "running": self.running[p],
+                    "served": self.served[p],
+                }
+                for p in PRIORITIES
+            },
+        }
+
+
+# Singleton instance
+crawl_scheduler = CrawlScheduler(settings.SELENIUM_POOL_SIZE)
@@ -2,26 +2,96 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
 import os
-import re
-import requests
 import asyncio
-from typing import Dict, Any, List
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
 from concurrent.futures import ThreadPoolExecutor
 import httpx
 from ..config import settings
+from .driver_pool import DriverPool
+from .page_readiness import SOURCE_READINESS, wait_until_ready
+from .browser_profile import apply_scraping_profile, enable_request_blocking, apply_source_blocking
+from .network_capture import enable_performance_log, drain_log, wait_for_payload, payload_html
+from .parsers import parse_page, shutdown_process_pool
+from .records import normalize_result
+from .cache import cache_service
+from .singleflight import single_flight
+from .keywords import normalize_keyword
+from .scam_index import scam_index
+from .crawl_queue import crawl_queue
+from .crawl_scheduler import crawl_scheduler, BACKGROUND_PRIORITIES
+from .source_guard import source_guard
+
+
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+# Source type (as used by the search API) -> source name
+SOURCES = {
+    'admin': 'admin.vn',
+    'checkscam': 'checkscam.vn',
+    'scam': 'scam.vn',
+    'chongluadao': 'chongluadao.vn',
+}
+
+SEARCH_URLS = {
+    'admin.vn': "https://admin.vn/scams?keyword={keyword}",
+    'checkscam.vn': "https://checkscam.vn/?qh_ss={keyword}",
+    'scam.vn': "https://scam.vn/tim-kiem?tu-khoa={keyword}",
+}
 
 
 class CrawlerService:
     """Service for crawling scam data from various sources"""
     
     def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=3)
+        self.executor = ThreadPoolExecutor(max_workers=settings.SELENIUM_POOL_SIZE)
+        self.driver_pool = DriverPool(
+            factory=self.init_driver,
+            max_size=settings.SELENIUM_POOL_SIZE,
+            max_pages=settings.SELENIUM_POOL_MAX_PAGES,
+            max_memory_mb=settings.SELENIUM_POOL_MAX_MEMORY_MB,
+            acquire_timeout=settings.SELENIUM_POOL_ACQUIRE_TIMEOUT,
+            # Network events pile up in chromedriver on every page load;
+            # drop them so the next XHR capture doesn't decode a backlog
+            on_reset=drain_log if settings.SELENIUM_XHR_CAPTURE else None,
+        )
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.background_tasks = set()
+        self.crawl_mode = settings.CRAWL_MODE
+        self.scrapers = {
+            'admin': self.scrape_admin_vn,
+            'checkscam': self.scrape_checkscam_vn,
+            'scam': self.scrape_scam_vn,
+        }
+    
+    async def start(self):
+        """Pre-launch the driver pool in the background (not needed in queue mode)"""
+        if settings.SELENIUM_POOL_PREWARM and self.crawl_mode == "inline":
+            loop = asyncio.get_event_loop()
+            started = await loop.run_in_executor(self.executor, self.driver_pool.warm)
+            print(f"✅ Driver pool warmed: {started} Chrome instance(s)")
+    
+    async def shutdown(self):
+        """Quit pooled drivers, the parse processes and the HTTP client"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(self.executor, self.driver_pool.close)
+        shutdown_process_pool()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+    
+    @contextmanager
+    def borrow_driver(self, driver=None):
+        """Yield the caller's driver, or borrow one from the pool and return it afterwards"""
+        if driver is not None:
+            yield driver
+        else:
+            with self.driver_pool.borrow() as pooled:
+                yield pooled
     
     def init_driver(self) -> webdriver.Chrome:
         """Initialize Chrome driver"""
@@ -35,305 +105,136 @@ class CrawlerService:
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument(
-            '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
-            '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
+        chrome_options.add_argument(f'--user-agent={USER_AGENT}')
         chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
         chrome_options.add_experimental_option('useAutomationExtension', False)
+        apply_scraping_profile(chrome_options)
+        enable_performance_log(chrome_options)
         
         chromedriver_path = os.path.join(os.getcwd(), 'chromedriver')
         
         if os.path.exists(chromedriver_path):
             service = Service(chromedriver_path)
-            return webdriver.Chrome(service=service, options=chrome_options)
+            driver = webdriver.Chrome(service=service, options=chrome_options)
         else:
             try:
                 from webdriver_manager.chrome import ChromeDriverManager
                 service = Service(ChromeDriverManager().install())
-                return webdriver.Chrome(service=service, options=chrome_options)
+                driver = webdriver.Chrome(service=service, options=chrome_options)
             except:
-                return webdriver.Chrome(options=chrome_options)
+                driver = webdriver.Chrome(options=chrome_options)
+        
+        enable_request_blocking(driver)
+        return driver
     
-    def scrape_admin_vn(self, keyword: str, driver: webdriver.Chrome) -> Dict[str, Any]:
-        """Scrape data from admin.vn"""
+    def _scrape_with_driver(self, source: str, keyword: str, driver=None) -> Dict[str, Any]:
+        """Render a source's search page in Chrome and parse the result"""
         try:
-            url = f"https://admin.vn/scams?keyword={keyword}"
-            driver.get(url)
-            
-            wait = WebDriverWait(driver, settings.SELENIUM_TIMEOUT)
-            wait.until(EC.presence_of_element_located((By.CLASS_NAME, "container")))
-            time.sleep(2)
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
-            # Get total scams count
-            alert_div = soup.find('div', class_='alert alert-danger text-center')
-            total_scams = "0"
-            search_keyword = keyword
-            
-            if alert_div:
-                strong_tags = alert_div.find_all('strong')
-                if len(strong_tags) >= 2:
-                    total_scams = strong_tags[0].text.strip()
-                    search_keyword = strong_tags[1].text.strip()
-            
-            # Get scam cards
-            scam_cards = soup.find_all('div', class_='scam-card')
-            scam_list = []
-            
-            for card in scam_cards:
-                if 'scam-header' in card.get('class', []):
-                    continue
+            with self.borrow_driver(driver) as driver:
+                apply_source_blocking(driver, source)
                 
-                columns = card.find_all('div', class_='scam-column')
+                url_patterns = settings.SELENIUM_XHR_CAPTURE.get(source)
+                if url_patterns:
+                    result = self._capture_xhr(source, keyword, driver, url_patterns)
+                    if result is not None:
+                        return result
+                else:
+                    driver.get(SEARCH_URLS[source].format(keyword=keyword))
+                    # Wait for result rows, a no-results marker or network idle
+                    wait_until_ready(driver, SOURCE_READINESS[source])
                 
-                if len(columns) >= 7:
-                    name_div = columns[0].find('div', class_='limit')
-                    name = name_div.text.strip() if name_div else ''
-                    
-                    amount = columns[1].text.strip()
-                    
-                    phone = columns[2].text.strip().replace('\n', '').replace(' ', '')
-                    phone_parts = phone.split()
-                    phone = phone_parts[-1] if phone_parts else phone
-                    
-                    account_number = columns[3].text.strip()
-                    bank = columns[4].text.strip()
-                    views = columns[5].text.strip().replace('lượt xem', '').strip()
-                    date = columns[6].text.strip()
-                    
-                    link_tag = card.find('a', class_='stretched-link')
-                    detail_link = link_tag['href'] if link_tag else ''
-                    
-                    scam_list.append({
-                        'name': name,
-                        'amount': amount,
-                        'phone': phone,
-                        'account_number': account_number,
-                        'bank': bank,
-                        'views': views,
-                        'date': date,
-                        'detail_link': detail_link
-                    })
-            
-            return {
-                'success': True,
-                'source': 'admin.vn',
-                'keyword': search_keyword,
-                'total_scams': total_scams,
-                'data': scam_list
-            }
+                result = parse_page(source, driver.page_source, keyword)
+                result['engine'] = 'selenium'
+                return result
             
         except Exception as e:
             return {
                 'success': False,
-                'source': 'admin.vn',
+                'source': source,
                 'error': str(e)
             }
-        finally:
-            if driver:
-                driver.quit()
+    
+    def _capture_xhr(self, source: str, keyword: str, driver, url_patterns) -> Optional[Dict[str, Any]]:
+        """Load the search page and parse the search XHR's payload
+        
+        Returns None when the DOM became ready first or the payload carries
+        no result markers; the page is then parsed from the rendered DOM.
+        """
+        drain_log(driver)
+        driver.get(SEARCH_URLS[source].format(keyword=keyword))
+        
+        kind, payload = wait_for_payload(driver, url_patterns, SOURCE_READINESS[source])
+        if kind != 'xhr':
+            return None
+        
+        result = parse_page(source, payload_html(payload), keyword, require_markers=True)
+        if result is None:
+            # Not the fragment we expected; let the page finish rendering
+            wait_until_ready(driver, SOURCE_READINESS[source])
+            return None
+        result['engine'] = 'selenium-xhr'
+        return result
+    
+    def scrape_admin_vn(self, keyword: str, driver=None) -> Dict[str, Any]:
+        """Scrape data from admin.vn"""
+        return self._scrape_with_driver('admin.vn', keyword, driver)
     
     def scrape_checkscam_vn(self, keyword: str, driver=None) -> Dict[str, Any]:
         """Scrape data from checkscam.vn using Selenium (required for JS rendering)"""
-        should_quit = False
-        if driver is None:
-            driver = self.init_driver()
-            should_quit = True
-        
-        try:
-            url = f"https://checkscam.vn/?qh_ss={keyword}"
-            driver.get(url)
-            
-            # Wait for results to load
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-            from selenium.webdriver.common.by import By
-            
-            wait = WebDriverWait(driver, 10)
-            wait.until(EC.presence_of_element_located((By.CLASS_NAME, "pst")))
-            time.sleep(2)
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
-            # Get total warnings count
-            h2_tag = soup.find('h2', class_='h1')
-            total_scams = "0"
-            search_keyword = keyword
-            
-            if h2_tag:
-                text = h2_tag.get_text()
-                match = re.search(r'Có (\d+) cảnh báo', text)
-                if match:
-                    total_scams = match.group(1)
-                match_keyword = re.search(r'"([^"]+)"', text)
-                if match_keyword:
-                    search_keyword = match_keyword.group(1)
-            
-            # Get warning list
-            scam_list = []
-            ct_divs = soup.find_all('div', class_='ct')
-            
-            # Limit items by total_scams
-            max_items = int(total_scams) if total_scams.isdigit() else len(ct_divs)
-            
-            for i, ct in enumerate(ct_divs):
-                if i >= max_items:
-                    break
-                    
-                ct1 = ct.find('div', class_='ct1')
-                ct2 = ct.find('div', class_='ct2')
-                
-                if ct1 and ct2:
-                    link_tag = ct1.find('a')
-                    if link_tag:
-                        name = link_tag.text.strip()
-                        detail_link = link_tag['href'] if 'href' in link_tag.attrs else ''
-                        
-                        spans = ct2.find_all('span')
-                        date = ''
-                        views = ''
-                        
-                        for span in spans:
-                            text = span.text.strip()
-                            if 'Lượt xem' in text:
-                                views = text.replace('Lượt xem', '').strip()
-                            elif 'tháng' in text or '...' in text:
-                                date = text.replace('...', '').strip()
-                        
-                        scam_list.append({
-                            'name': name,
-                            'date': date,
-                            'views': views,
-                            'detail_link': detail_link
-                        })
-            
-            return {
-                'success': True,
-                'source': 'checkscam.vn',
-                'keyword': search_keyword,
-                'total_scams': total_scams,
-                'data': scam_list
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'source': 'checkscam.vn',
-                'error': str(e)
-            }
-        finally:
-            if should_quit and driver:
-                driver.quit()
+        return self._scrape_with_driver('checkscam.vn', keyword, driver)
     
     def scrape_scam_vn(self, keyword: str, driver=None) -> Dict[str, Any]:
         """Search scam.vn using their internal search page (requires Selenium for JS rendering)"""
-        should_quit = False
-        if driver is None:
-            driver = self.init_driver()
-            should_quit = True
+        return self._scrape_with_driver('scam.vn', keyword, driver)
+    
+    def get_http_client(self) -> httpx.AsyncClient:
+        """Shared keep-alive HTTP client for the direct fetch engine"""
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(
+                timeout=settings.HTTP_FETCH_TIMEOUT,
+                follow_redirects=True,
+                headers={
+                    'User-Agent': USER_AGENT,
+                    'Accept-Language': 'vi-VN,vi;q=0.9,en;q=0.8',
+                },
+            )
+        return self.http_client
+    
+    async def fetch_http(self, source: str, keyword: str) -> Optional[Dict[str, Any]]:
+        """Fetch a source's result page over plain HTTP
         
+        Returns None when the page carries no result markers (data is
+        rendered client-side) or the request fails, so the caller can fall
+        back to Selenium.
+        """
         try:
-            # Use scam.vn internal search
-            url = f"https://scam.vn/tim-kiem?tu-khoa={keyword}"
-            driver.get(url)
-            
-            # Wait longer for AJAX results to load
-            time.sleep(6)
-            
-            # Get page source after JS execution
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
-            scam_list = []
-            
-            # Find result table (try multiple selectors)
-            table = soup.find('table', class_='table')
-            if not table:
-                # Try finding by other attributes
-                table = soup.find('table')
-            
-            if table:
-                # Find rows - try both class='rs' and all tr tags
-                result_rows = table.find_all('tr', class_='rs')
-                if not result_rows:
-                    # Get all rows except header
-                    all_rows = table.find_all('tr')
-                    result_rows = [r for r in all_rows if len(r.find_all('td')) >= 3]
-                
-                for row in result_rows:
-                    tds = row.find_all('td')
-                    if len(tds) >= 3:
-                        # Column 1: STT (skip)
-                        # Column 2: Name with link
-                        name_cell = tds[1]
-                        link_tag = name_cell.find('a')
-                        
-                        # Column 3: Account info
-                        account_cell = tds[2]
-                        
-                        if link_tag:
-                            name = link_tag.get_text().strip()
-                            detail_link = link_tag.get('href', '')
-                            if detail_link.startswith('/'):
-                                detail_link = f"https://scam.vn{detail_link}"
-                            
-                            # Extract account number
-                            account_div = account_cell.find('div', class_='sotaikhoan')
-                            account_number = ''
-                            account_name = ''
-                            if account_div:
-                                account_spans = account_div.find_all('span', class_='hidden-info')
-                                for span in account_spans:
-                                    if span.get('data-type') == 'tknganhang':
-                                        account_number = span.get('data-value', '')
-                                    elif span.get('data-type') == 'tenkhac':
-                                        account_name = span.get('data-value', '')
-                            
-                            # Extract bank name
-                            bank = ''
-                            bank_div = account_cell.find('div', class_='tennganhang')
-                            if bank_div:
-                                bank_badge = bank_div.find('span', class_='badge')
-                                if bank_badge:
-                                    bank = bank_badge.get_text().strip()
-                            
-                            scam_list.append({
-                                'name': name,
-                                'account_number': account_number,
-                                'account_name': account_name,
-                                'bank': bank,
-                                'detail_link': detail_link,
-                                'keyword_found': keyword
-                            })
-            
-            return {
-                'success': True,
-                'source': 'scam.vn',
-                'keyword': keyword,
-                'total_scams': str(len(scam_list)),
-                'data': scam_list
-            }
+            client = self.get_http_client()
+            response = await client.get(SEARCH_URLS[source].format(keyword=keyword))
+            response.raise_for_status()
             
+            # Parse off the event loop; the default executor keeps this out of
+            # the Selenium thread pool
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(
+                None, parse_page, source, response.text, keyword, True
+            )
         except Exception as e:
-            return {
-                'success': False,
-                'source': 'scam.vn',
-                'error': str(e)
-            }
-        finally:
-            if should_quit and driver:
-                driver.quit()
+            print(f"HTTP fetch error ({source}): {e}")
+            return None
+        
+        if result is not None:
+            result['engine'] = 'http'
+        return result
     
     async def scrape_chongluadao_vn(self, keyword: str) -> Dict[str, Any]:
         """Scrape data from chongluadao.vn (API-based, no Selenium needed)"""
         try:
             url = f"https://feeds.chongluadao.vn/checkmisc?q={keyword}"
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
+            client = self.get_http_client()
+            response = await client.get(url, timeout=10.0)
+            response.raise_for_status()
+            data = response.json()
             
             scam_list = []
             total_scams = 0
@@ -386,73 +287,426 @@ class CrawlerService:
                 'error': str(e)
             }
     
-    async def search_all_sources(self, keyword: str) -> Dict[str, Any]:
-        """Search across all sources in parallel"""
+    async def run_scraper(self, scraper, keyword: str) -> Dict[str, Any]:
+        """Run a blocking Selenium scraper in the crawler thread pool"""
         loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, scraper, keyword)
+    
+    async def search_source(
+        self,
+        source: str,
+        keyword: str,
+        use_cache: bool = True,
+        priority: str = 'web'
+    ) -> Dict[str, Any]:
+        """Search a single source: per-source cache first, then one coalesced crawl"""
+        if use_cache:
+            cached = await cache_service.get_scam_sources(keyword, [source])
+            if source in cached:
+                return await self._serve_cached(source, keyword, cached[source])
         
-        # Run admin.vn with Selenium in thread pool (needs JS rendering)
-        future_admin = loop.run_in_executor(
-            self.executor, 
-            self.scrape_admin_vn, 
-            keyword, 
-            self.init_driver()
+        flight_key = f"{source}:{normalize_keyword(keyword)}"
+        return await single_flight.do(
+            flight_key,
+            lambda: self.crawl_source(source, keyword, priority),
+            recheck=lambda: self._fresh_cached(source, keyword),
         )
+    
+    async def _fresh_cached(self, source: str, keyword: str) -> Optional[Dict[str, Any]]:
+        """A fresh cache entry for the source, e.g. one another worker just wrote"""
+        cached = await cache_service.get_scam_sources(keyword, [source])
+        entry = cached.get(source)
+        if entry is None or entry['stale']:
+            return None
+        return {**entry['data'], 'cached': True, 'stale': False}
+    
+    async def _serve_cached(self, source: str, keyword: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a cached result, refreshing it in the background when stale"""
+        results = await self._serve_cached_many([(source, keyword, entry)])
+        return results[0]
+    
+    async def _serve_cached_many(self, items: List[Tuple[str, str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """``_serve_cached`` for many (source, keyword, entry) items at once
         
-        # Run checkscam.vn with Selenium in thread pool (needs JS rendering)
-        future_checkscam = loop.run_in_executor(
-            self.executor,
-            self.scrape_checkscam_vn,
-            keyword,
-            self.init_driver()
-        )
+        Hit counters and refresh claims each go out in one pipeline, and
+        the circuit breaker is read once per stale source.
+        """
+        await cache_service.increment_hits([
+            cache_service.scam_source_key(keyword, source) for source, keyword, _ in items
+        ])
         
-        # Run scam.vn with Selenium in thread pool (also needs JS rendering)
-        future_scam = loop.run_in_executor(
-            self.executor,
-            self.scrape_scam_vn,
-            keyword,
-            self.init_driver()
-        )
+        stale = [(source, keyword) for source, keyword, entry in items if entry['stale']]
+        if stale:
+            stale_sources = sorted({source for source, _ in stale})
+            is_open = await asyncio.gather(*(source_guard.is_open(source) for source in stale_sources))
+            open_sources = {source for source, closed in zip(stale_sources, is_open) if closed}
+            pairs = [(keyword, source) for source, keyword in stale if source not in open_sources]
+            claims = await cache_service.mark_refreshing_many(pairs, settings.SINGLE_FLIGHT_LOCK_TTL)
+            for (keyword, source), claimed in zip(pairs, claims):
+                if claimed:
+                    self._start_refresh(source, keyword)
         
-        # Run async scraper for chongluadao (API-based, fast)
-        future_chongluadao = self.scrape_chongluadao_vn(keyword)
+        return [{**entry['data'], 'cached': True, 'stale': entry['stale']} for _, _, entry in items]
+    
+    async def refresh_source(self, source: str, keyword: str) -> bool:
+        """Start one background re-crawl of a source (deduplicated across workers)
         
-        # Wait for all to complete
-        results = await asyncio.gather(
-            future_admin,
-            future_checkscam,
-            future_scam,
-            future_chongluadao,
-            return_exceptions=True
+        The re-crawl waits for a prefetch-class slot; the stale entry keeps
+        being served meanwhile.
+        """
+        if await source_guard.is_open(source):
+            return False
+        if not await cache_service.mark_refreshing(keyword, source, settings.SINGLE_FLIGHT_LOCK_TTL):
+            return False
+        self._start_refresh(source, keyword)
+        return True
+    
+    def _start_refresh(self, source: str, keyword: str):
+        """Run a claimed refresh in the background"""
+        flight_key = f"{source}:{normalize_keyword(keyword)}"
+        task = asyncio.ensure_future(
+            single_flight.do(
+                flight_key,
+                lambda: self.crawl_source(source, keyword, 'prefetch'),
+                recheck=lambda: self._fresh_cached(source, keyword),
+            )
         )
+        self._keep_in_background(task)
+    
+    async def refresh_sources(self, keyword: str, sources: Optional[List[str]] = None) -> List[str]:
+        """Re-crawl, in the background, the sources whose cache entry is missing or stale"""
+        sources = sources or list(SOURCES)
+        entries = await cache_service.get_scam_sources(keyword, sources)
+        refreshed = []
+        for source in sources:
+            entry = entries.get(source)
+            if (entry is None or entry['stale']) and await self.refresh_source(source, keyword):
+                refreshed.append(source)
+        return refreshed
+    
+    async def crawl_source(self, source: str, keyword: str, priority: str = 'web') -> Dict[str, Any]:
+        """Crawl a source and cache a successful result under its own TTL
         
-        # Filter out exceptions and format results
-        sources = []
-        for result in results:
-            if isinstance(result, dict):
-                sources.append(result)
-            else:
-                sources.append({
-                    'success': False,
-                    'error': str(result)
-                })
+        In queue mode the crawl (and the cache write) happens on a worker.
+        A source whose circuit breaker is open, or that is out of rate-limit
+        tokens, is not fetched; its stale cache entry is served instead if
+        there is one.
+        """
+        if self.crawl_mode == "queue":
+            if await source_guard.is_open(source):
+                return await self._short_circuit(source, keyword, 'unavailable')
+            result = await crawl_queue.crawl(source, SOURCES[source], keyword, priority)
+            return {**result, 'cached': False}
+        
+        if not await source_guard.allow(source):
+            return await self._short_circuit(source, keyword, 'unavailable')
+        
+        result = await self._search_source(source, keyword, priority)
+        if result.get('status') == 'rate_limited':
+            return await self._short_circuit(source, keyword, 'rate_limited')
+        if result.get('success'):
+            await cache_service.set_scam_source(keyword, source, result)
+            if result.get('data'):
+                self._keep_in_background(asyncio.ensure_future(scam_index.index_result(keyword, result)))
+        return {**result, 'cached': False}
+    
+    async def _search_source(self, source: str, keyword: str, priority: str = 'web') -> Dict[str, Any]:
+        """Search a single source, preferring direct HTTP over a browser render
+        
+        Browser renders wait for a Chrome slot in ``priority``'s class.
+        """
+        if source == 'chongluadao':
+            return await self._guarded_fetch(source, lambda: self.scrape_chongluadao_vn(keyword))
+        
+        source_name = SOURCES[source]
+        if settings.HTTP_FETCH_ENABLED and not SOURCE_READINESS[source_name].browser_only:
+            result = await self._guarded_fetch(source, lambda: self.fetch_http(source_name, keyword))
+            if result is not None:
+                return result
+        
+        async with crawl_scheduler.slot(priority):
+            return await self._guarded_fetch(source, lambda: self.run_scraper(self.scrapers[source], keyword))
+    
+    async def _guarded_fetch(self, source: str, fetch) -> Optional[Dict[str, Any]]:
+        """Run one upstream request under the source's rate limit and breaker
+        
+        Failures, exceptions and fetches slower than the source's search
+        budget count against the breaker; a None result (no answer, fall
+        back) counts as neither.
+        """
+        if not await source_guard.acquire(source):
+            return {
+                'success': False,
+                'source': SOURCES[source],
+                'status': 'rate_limited',
+                'error': f"{SOURCES[source]} rate limit reached"
+            }
+        
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        try:
+            result = await fetch()
+        except Exception:
+            await source_guard.record_failure(source)
+            raise
+        
+        if result is None:
+            return None
+        result = normalize_result(result)
+        if result.get('success') and loop.time() - start <= self._source_budget(source):
+            await source_guard.record_success(source)
+        else:
+            await source_guard.record_failure(source)
+        return result
+    
+    async def _short_circuit(self, source: str, keyword: str, status: str) -> Dict[str, Any]:
+        """Serve a stale cache entry for a source we won't fetch, or say it's unavailable"""
+        cached = await cache_service.get_scam_sources(keyword, [source])
+        if source in cached:
+            return {**cached[source]['data'], 'cached': True, 'stale': True, 'short_circuited': status}
+        
+        reason = 'is temporarily unavailable' if status == 'unavailable' else 'rate limit reached'
+        return {
+            'success': False,
+            'source': SOURCES[source],
+            'status': status,
+            'error': f"{SOURCES[source]} {reason}",
+            'cached': False
+        }
+    
+    async def queue_depth(self) -> int:
+        """Crawls waiting for Chrome capacity (locally, or on the worker streams)"""
+        if self.crawl_mode == "queue":
+            return await crawl_queue.depth()
+        return crawl_scheduler.queued()
+    
+    def _shed_result(self, source: str, depth: int) -> Dict[str, Any]:
+        """Result for a source not crawled because the crawler is saturated"""
+        return {
+            'success': False,
+            'source': SOURCES[source],
+            'status': 'shed',
+            'error': 'Crawler is busy, try again shortly',
+            'queue_depth': depth,
+            'retry_after': crawl_scheduler.retry_after(depth),
+        }
+    
+    def shed_retry_after(self, result: Dict[str, Any]) -> Optional[int]:
+        """Retry-After seconds when a search was shed with nothing to serve, else None"""
+        if not result.get('shed_sources') or result.get('complete_sources'):
+            return None
+        return max(s['retry_after'] for s in result['sources'] if s.get('status') == 'shed')
+    
+    def build_search_result(self, keyword: str, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate per-source results into a search response
         
-        # Calculate total
+        Only sources that completed count towards total_results.
+        """
         total_results = 0
         for source in sources:
-            if source.get('success'):
-                scams = source.get('total_scams', 0)
-                if isinstance(scams, str) and scams.isdigit():
-                    total_results += int(scams)
-                elif isinstance(scams, int):
-                    total_results += scams
+            if source.get('success') and source.get('status', 'complete') == 'complete':
+                total_results += source.get('total_scams', 0)
+        
+        timed_out = [s.get('source') for s in sources if s.get('status') == 'timed_out']
+        shed = [s.get('source') for s in sources if s.get('status') == 'shed']
+        unavailable = [s.get('source') for s in sources if s.get('status') in ('unavailable', 'rate_limited')]
         
         return {
             'success': any(s.get('success') for s in sources),
             'keyword': keyword,
             'total_results': total_results,
-            'sources': sources
+            'sources': sources,
+            'complete_sources': [s.get('source') for s in sources if s.get('status', 'complete') == 'complete' and s.get('success')],
+            'timed_out_sources': timed_out,
+            'shed_sources': shed,
+            'unavailable_sources': unavailable,
+            'partial': bool(timed_out or shed),
+            'cached': bool(sources) and all(s.get('cached') for s in sources),
+            'stale': any(s.get('stale') for s in sources)
         }
+    
+    async def lookup_indexed(self, keyword: str, sources: List[str]) -> List[Dict[str, Any]]:
+        """Locally indexed results for ``merge_indexed``, read off the event loop"""
+        loop = asyncio.get_event_loop()
+        source_names = {SOURCES[source] for source in sources}
+        return await loop.run_in_executor(None, scam_index.indexed_sources, keyword, source_names)
+    
+    def merge_indexed(self, keyword: str, result: Dict[str, Any], indexed: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fill sources a search couldn't answer with locally indexed records
+        
+        Sources that completed (crawled or cached) keep their own data, which
+        is at least as fresh as the index.
+        """
+        by_source = {source['source']: source for source in indexed}
+        if not by_source:
+            return result
+        
+        sources = []
+        for source in result['sources']:
+            fallback = by_source.pop(source.get('source'), None)
+            answered = source.get('success') and source.get('status', 'complete') == 'complete'
+            if answered or fallback is None:
+                sources.append(source)
+            else:
+                sources.append({**fallback, 'replaces_status': source.get('status')})
+        
+        merged = self.build_search_result(keyword, sources + list(by_source.values()))
+        merged['from_index'] = any(source.get('from_index') for source in merged['sources'])
+        return merged
+    
+    def _task_result(self, task: asyncio.Future, source: str) -> Dict[str, Any]:
+        """Turn a finished source task into a result dict with a status"""
+        if task.exception() is None:
+            result = task.result()
+        else:
+            result = {
+                'success': False,
+                'source': SOURCES[source],
+                'error': str(task.exception())
+            }
+        result['status'] = 'complete' if result.get('success') else result.get('status', 'failed')
+        return result
+    
+    def _source_budget(self, source: str) -> float:
+        budget = settings.SEARCH_SOURCE_BUDGETS.get(source, settings.SEARCH_TOTAL_BUDGET)
+        return min(budget, settings.SEARCH_TOTAL_BUDGET)
+    
+    async def iter_all_sources(
+        self,
+        keyword: str,
+        sources: Optional[List[str]] = None,
+        cached: Optional[Dict[str, Dict[str, Any]]] = None,
+        priority: str = 'web'
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (source type, result) for each source as soon as it finishes
+        
+        Sources with a cached result are served from one MGET (stale ones are
+        refreshed in the background) and only the rest are crawled. Callers
+        that already read the cache pass its entries as ``cached``. When the
+        crawl backlog is over the admission limit for a user-facing
+        ``priority``, sources that may need Chrome are yielded as ``shed``
+        instead, and a crawl that misses its budget (SEARCH_SOURCE_BUDGETS,
+        capped by SEARCH_TOTAL_BUDGET) is yielded as ``timed_out``; it keeps
+        running in the background and fills the cache for the next caller.
+        Background priorities (bulk, prefetch) wait for a slot and for the
+        crawl to finish instead.
+        """
+        sources = sources or list(SOURCES)
+        
+        if cached is None:
+            cached = await cache_service.get_scam_sources(keyword, sources)
+        served = await self._serve_cached_many([(source, keyword, entry) for source, entry in cached.items()])
+        for source, result in zip(cached, served):
+            yield source, {**result, 'status': 'complete'}
+        
+        misses = [source for source in sources if source not in cached]
+        if priority not in BACKGROUND_PRIORITIES and any(source in self.scrapers for source in misses):
+            depth = await self.queue_depth()
+            if not crawl_scheduler.admits(priority, depth):
+                for source in [s for s in misses if s in self.scrapers]:
+                    yield source, self._shed_result(source, depth)
+                misses = [source for source in misses if source not in self.scrapers]
+        
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        
+        tasks = {
+            asyncio.ensure_future(self.search_source(source, keyword, use_cache=False, priority=priority)): source
+            for source in misses
+        }
+        deadlines = {} if priority in BACKGROUND_PRIORITIES else {
+            task: start + self._source_budget(source) for task, source in tasks.items()
+        }
+        pending = set(tasks)
+        
+        try:
+            while pending:
+                timeout = max(0, min(deadlines[task] for task in pending) - loop.time()) if deadlines else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    source = tasks[task]
+                    yield source, self._task_result(task, source)
+                
+                now = loop.time()
+                for task in [t for t in pending if t in deadlines and deadlines[t] <= now]:
+                    pending.discard(task)
+                    self._keep_in_background(task)
+                    source = tasks[task]
+                    yield source, {
+                        'success': False,
+                        'source': SOURCES[source],
+                        'status': 'timed_out',
+                        'error': f"Timed out after {self._source_budget(source):.1f}s"
+                    }
+        finally:
+            # Crawls still running when the caller stops listening finish on
+            # their own and cache their result
+            for task in pending:
+                self._keep_in_background(task)
+    
+    def _keep_in_background(self, task: asyncio.Future):
+        """Hold a reference to a crawl that outlives its request"""
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+    
+    async def search_all_sources(
+        self,
+        keyword: str,
+        sources: Optional[List[str]] = None,
+        priority: str = 'web'
+    ) -> Dict[str, Any]:
+        """Search across all (or the given) sources in parallel, within the search budget"""
+        sources = sources or list(SOURCES)
+        results = {}
+        async for source, result in self.iter_all_sources(keyword, sources, priority=priority):
+            results[source] = result
+        
+        # Keep a stable source order regardless of completion order
+        return self.build_search_result(keyword, [results[source] for source in sources])
+    
+    async def iter_bulk_search(
+        self,
+        keywords: List[str],
+        sources: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a search result per keyword as each one finishes
+        
+        The cache entries of every keyword/source pair come from a single
+        MGET, and fully cached keywords are served in one batch (hit
+        counters and refresh claims pipelined) and yielded straight away.
+        The rest are searched at most BULK_CRAWL_CONCURRENCY keywords at a
+        time, each re-reading the cache when its turn comes.
+        """
+        sources = sources or list(SOURCES)
+        cached = await cache_service.get_scam_sources_many(keywords, sources)
+        semaphore = asyncio.Semaphore(settings.BULK_CRAWL_CONCURRENCY)
+        
+        async def search(keyword: str) -> Dict[str, Any]:
+            async with semaphore:
+                results = {}
+                async for source, result in self.iter_all_sources(keyword, sources, priority='bulk'):
+                    results[source] = result
+            return self.build_search_result(keyword, [results[source] for source in sources])
+        
+        hits = [keyword for keyword in keywords if len(cached[keyword]) == len(sources)]
+        misses = [keyword for keyword in keywords if len(cached[keyword]) < len(sources)]
+        
+        served = iter(await self._serve_cached_many([
+            (source, keyword, cached[keyword][source]) for keyword in hits for source in sources
+        ]))
+        for keyword in hits:
+            results = [{**next(served), 'status': 'complete'} for _ in sources]
+            yield self.build_search_result(keyword, results)
+        
+        tasks = [asyncio.ensure_future(search(keyword)) for keyword in misses]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
 
 
 # Singleton instance
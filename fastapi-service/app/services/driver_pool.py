@@ -0,0 +1,264 @@
+"""Pool of warm, reusable Chrome WebDriver instances for the crawler"""
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Optional
+import queue
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - memory-based recycling is disabled
+    psutil = None
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no driver becomes available within the acquire timeout"""
+
+
+class DriverPool:
+    """Bounded, thread-safe pool of pre-launched Chrome drivers
+
+    Scrapers run in a thread pool, so drivers are handed out from a
+    ``queue.LifoQueue`` (most recently used first, keeping the warmest
+    browsers busy). Drivers are health-checked on checkout and recycled
+    after ``max_pages`` page loads or when the browser process tree grows
+    beyond ``max_memory_mb``. ``on_reset`` runs on every driver returned
+    to the pool, after its page is unloaded.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_size: int = 3,
+        max_pages: int = 50,
+        max_memory_mb: int = 0,
+        acquire_timeout: float = 30.0,
+        on_reset: Optional[Callable[[Any], None]] = None,
+    ):
+        self.factory = factory
+        self.on_reset = on_reset
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._pages: Dict[int, int] = {}
+        self._closed = False
+
+        # Metrics
+        self._created = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recycled: Dict[str, int] = {
+            "pages": 0,
+            "memory": 0,
+            "unhealthy": 0,
+            "error": 0,
+        }
+
+    def warm(self, count: Optional[int] = None) -> int:
+        """Pre-launch drivers so the first searches skip Chrome cold starts"""
+        target = min(count or self.max_size, self.max_size)
+        started = 0
+
+        while True:
+            with self._lock:
+                if self._closed or self._size >= target:
+                    break
+                self._size += 1
+
+            try:
+                driver = self._create()
+            except Exception as e:
+                with self._lock:
+                    self._size -= 1
+                print(f"Driver pool warm-up error: {e}")
+                break
+
+            self._idle.put(driver)
+            started += 1
+
+        return started
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Borrow a healthy driver, launching one if the pool is not full"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            driver = None
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                create = False
+                with self._lock:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+
+                if create:
+                    try:
+                        driver = self._create()
+                    except Exception:
+                        with self._lock:
+                            self._size -= 1
+                        raise
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._record_timeout()
+                        raise DriverPoolTimeout(
+                            f"No Chrome driver available after {timeout:.1f}s"
+                        )
+                    try:
+                        driver = self._idle.get(timeout=remaining)
+                    except queue.Empty:
+                        self._record_timeout()
+                        raise DriverPoolTimeout(
+                            f"No Chrome driver available after {timeout:.1f}s"
+                        )
+
+            if not self._is_healthy(driver):
+                self._destroy(driver, "unhealthy")
+                continue
+
+            self._record_wait(time.monotonic() - start)
+            return driver
+
+    def release(self, driver: Any, discard: bool = False):
+        """Return a driver to the pool, recycling it when it is worn out"""
+        if driver is None:
+            return
+
+        with self._lock:
+            pages = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = pages
+            closed = self._closed
+
+        if closed:
+            self._destroy(driver, None)
+        elif discard:
+            self._destroy(driver, "error")
+        elif self.max_pages and pages >= self.max_pages:
+            self._destroy(driver, "pages")
+        elif self.max_memory_mb and self._memory_mb(driver) > self.max_memory_mb:
+            self._destroy(driver, "memory")
+        elif not self._reset(driver):
+            self._destroy(driver, "unhealthy")
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def borrow(self, timeout: Optional[float] = None):
+        """Context manager that returns the driver to the pool
+
+        A driver whose body raised is discarded only if it fails the health
+        check; a page that was merely slow leaves a working browser.
+        """
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, discard=not self._is_healthy(driver))
+            raise
+        self.release(driver)
+
+    def close(self):
+        """Quit every idle driver; in-use drivers are quit when released"""
+        with self._lock:
+            self._closed = True
+
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._destroy(driver, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool size, wait time and recycle counters"""
+        with self._lock:
+            acquired = self._acquired
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": self._idle.qsize(),
+                "in_use": self._size - self._idle.qsize(),
+                "created": self._created,
+                "acquired": acquired,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": round(self._wait_total / acquired * 1000, 1) if acquired else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 1),
+                "recycled": dict(self._recycled),
+                "max_pages": self.max_pages,
+                "max_memory_mb": self.max_memory_mb,
+            }
+
+    def _create(self) -> Any:
+        driver = self.factory()
+        with self._lock:
+            self._created += 1
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _destroy(self, driver: Any, reason: Optional[str]):
+        with self._lock:
+            self._size -= 1
+            self._pages.pop(id(driver), None)
+            if reason:
+                self._recycled[reason] = self._recycled.get(reason, 0) + 1
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Driver quit error: {e}")
+
+    def _is_healthy(self, driver: Any) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, driver: Any) -> bool:
+        """Unload the last page so an idle browser holds no DOM or timers"""
+        try:
+            driver.get("about:blank")
+            if self.on_reset:
+                self.on_reset(driver)
+            return True
+        except Exception:
+            return False
+
+    def _memory_mb(self, driver: Any) -> float:
+        """Resident memory of the chromedriver process and its Chrome children"""
+        if psutil is None:
+            return 0.0
+        try:
+            process = psutil.Process(driver.service.process.pid)
+            rss = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return rss / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    def _record_wait(self, waited: float):
+        with self._lock:
+            self._acquired += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    def _record_timeout(self):
+        with self._lock:
+            self._timeouts += 1
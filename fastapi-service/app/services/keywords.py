@@ -0,0 +1,108 @@
+"""Canonical keyword normalization shared by the API, Zalo webhook and cache"""
+import re
+
+
+SEPARATORS = r'[\s\-\.\(\)]'
+
+# Vietnamese phone numbers: 0xxxxxxxxx, +84xxxxxxxxx or 84xxxxxxxxx
+PHONE_PATTERN = r'^(0|\+84)[0-9]{9,10}$'
+BARE_84_MOBILE_PATTERN = r'^84[35789][0-9]{8}$'
+
+# Bank account: 6-16 digits
+ACCOUNT_PATTERN = r'^[0-9]{6,16}$'
+
+EMAIL_PATTERN = r'^[^\s@/:]+@[^\s@/:]+\.[a-z]{2,}$'
+
+URL_PATTERN = r'https?://[^\s]+|www\.[^\s]+|[^\s]+\.(com|vn|org|net|io|me|edu|gov)[^\s]*'
+DOMAIN_PATTERN = r'https?://([^\s]+)|www\.([^\s]+)|([^\s]+\.(com|vn|org|net|io|me|edu|gov))'
+
+
+def _strip_separators(text: str) -> str:
+    return re.sub(SEPARATORS, '', text.strip())
+
+
+def is_phone_number(text: str) -> bool:
+    """Check if text is a phone number"""
+    clean_text = _strip_separators(text)
+    return bool(re.match(PHONE_PATTERN, clean_text) or re.match(BARE_84_MOBILE_PATTERN, clean_text))
+
+
+def is_bank_account(text: str) -> bool:
+    """Check if text is a bank account number"""
+    return bool(re.match(ACCOUNT_PATTERN, _strip_separators(text)))
+
+
+def is_email(text: str) -> bool:
+    """Check if text is a bare email address"""
+    return bool(re.match(EMAIL_PATTERN, text.strip().lower()))
+
+
+def is_url(text: str) -> bool:
+    """Check if text contains URL"""
+    return bool(re.search(URL_PATTERN, text.lower()))
+
+
+def is_bare_url(text: str) -> bool:
+    """Check if the whole text is a URL or host (not a sentence containing one)"""
+    return bool(re.fullmatch(URL_PATTERN, text.strip().lower()))
+
+
+def normalize_phone(text: str) -> str:
+    """Canonical national form: "+84 912-345-678" -> "0912345678" """
+    clean_text = _strip_separators(text)
+    if clean_text.startswith('+84'):
+        return '0' + clean_text[3:]
+    if re.match(BARE_84_MOBILE_PATTERN, clean_text):
+        return '0' + clean_text[2:]
+    return clean_text
+
+
+def normalize_domain(text: str) -> str:
+    """Lowercase host without scheme, "www.", port or path"""
+    match = re.search(DOMAIN_PATTERN, text.lower())
+    if not match:
+        return text.strip().lower()
+
+    for group in match.groups():
+        if group:
+            host = re.split(r'[/?#]', group)[0]
+            host = host.split('@')[-1].split(':')[0]
+            if host.startswith('www.'):
+                host = host[4:]
+            return host.rstrip('.')
+    return text.strip().lower()
+
+
+def normalize_keyword(text: str) -> str:
+    """Canonical search keyword
+
+    Phones become "0xxxxxxxxx", account numbers lose their separators,
+    emails are lowercased, a keyword that is a URL or host is reduced to
+    its lowercase domain, and anything else (including free text that
+    mentions a domain) has its whitespace collapsed.
+    """
+    if is_phone_number(text):
+        return normalize_phone(text)
+
+    if is_bank_account(text):
+        return _strip_separators(text)
+
+    # Emails would otherwise match the URL pattern and lose their local part
+    if is_email(text):
+        return text.strip().lower()
+
+    if is_bare_url(text):
+        return normalize_domain(text)
+
+    return ' '.join(text.split())
+
+
+def extract_searchable_keyword(text: str) -> str:
+    """Extract searchable keyword from a chat message (phone, account, or URL)
+
+    Unlike ``normalize_keyword``, a message that mentions a link anywhere is
+    searched by the link's domain.
+    """
+    if is_url(text) and not (is_phone_number(text) or is_bank_account(text) or is_email(text)):
+        return normalize_domain(text)
+    return normalize_keyword(text)
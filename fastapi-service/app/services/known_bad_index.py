@@ -0,0 +1,188 @@
+"""In-process membership index of reported phone and account numbers"""
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional
+import asyncio
+import logging
+import re
+import time
+
+from sqlalchemy import and_, or_
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Report, ScamRecord
+from .keywords import is_phone_number, normalize_keyword
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(digits: str) -> int:
+    """Pack a digit string into an int64, keeping leading zeros distinct"""
+    return int(digits) * 100 + len(digits)
+
+
+def _phone_code(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    phone = normalize_keyword(value)
+    return _encode(phone) if is_phone_number(phone) else None
+
+
+def _account_code(value: Optional[str]) -> Optional[int]:
+    digits = re.sub(r'\D', '', value or '')
+    return _encode(digits) if 6 <= len(digits) <= 16 else None
+
+
+def _merge(current: array, codes: Iterable[int]) -> array:
+    """Return a new sorted, de-duplicated array with ``codes`` added"""
+    merged = set(current)
+    merged.update(codes)
+    return array('q', sorted(merged))
+
+
+class KnownBadIndex:
+    """Sorted int64 arrays of canonical phones/accounts seen in reports
+
+    Built from user reports and the crawled scam_records table, then topped
+    up incrementally from id/last_seen watermarks. Lookups are a bisect over
+    a flat array, so the Zalo bot and the search API can give a "this number
+    has been reported" verdict before any source is crawled. Arrays are
+    replaced wholesale on reload, so readers never see a partial update.
+    """
+
+    def __init__(self):
+        self.phones = array('q')
+        self.accounts = array('q')
+        self.last_report_id = 0
+        self.last_record_seen: Optional[datetime] = None
+        self.last_record_id = 0  # tie-breaker for records sharing last_record_seen
+        self.last_full_load = 0.0
+        self.loaded_at: Optional[datetime] = None
+        self.is_running = False
+
+    def _contains(self, codes: array, code: Optional[int]) -> bool:
+        if code is None:
+            return False
+        i = bisect_left(codes, code)
+        return i < len(codes) and codes[i] == code
+
+    def verdict(self, keyword: str) -> Optional[Dict[str, Any]]:
+        """Preliminary verdict for a phone/account keyword, None for other keywords"""
+        phone_code = _phone_code(keyword) if is_phone_number(keyword) else None
+        account_code = _account_code(keyword) if keyword.isdigit() else None
+        if phone_code is None and account_code is None:
+            return None
+
+        reported_as = []
+        if self._contains(self.phones, phone_code):
+            reported_as.append("phone")
+        if self._contains(self.accounts, account_code):
+            reported_as.append("account")
+
+        return {
+            "reported": bool(reported_as),
+            "matched": reported_as,
+            "index_loaded": self.loaded_at is not None,
+        }
+
+    def load(self, full: bool = False) -> int:
+        """Pull new reports and crawled records into the index
+
+        Returns the number of rows read. ``full`` rebuilds from scratch so
+        deleted reports eventually drop out.
+        """
+        db = SessionLocal()
+        try:
+            if full:
+                phones, accounts = array('q'), array('q')
+                last_report_id, last_record_seen, last_record_id = 0, None, 0
+            else:
+                phones, accounts = self.phones, self.accounts
+                last_report_id = self.last_report_id
+                last_record_seen, last_record_id = self.last_record_seen, self.last_record_id
+
+            new_phones, new_accounts = set(), set()
+
+            reports = db.query(Report.id, Report.phone_number, Report.account_number).filter(
+                Report.id > last_report_id
+            ).all()
+            for report_id, phone, account in reports:
+                new_phones.add(_phone_code(phone))
+                new_accounts.add(_account_code(account))
+                last_report_id = max(last_report_id, report_id)
+
+            # Strictly after the (last_seen, id) cursor, so the newest record
+            # of the previous load isn't read again
+            query = db.query(
+                ScamRecord.id, ScamRecord.phone_canonical, ScamRecord.account_canonical, ScamRecord.last_seen
+            )
+            if last_record_seen is not None:
+                query = query.filter(or_(
+                    ScamRecord.last_seen > last_record_seen,
+                    and_(ScamRecord.last_seen == last_record_seen, ScamRecord.id > last_record_id),
+                ))
+            records = query.order_by(ScamRecord.last_seen, ScamRecord.id).all()
+            for record_id, phone, account, last_seen in records:
+                new_phones.add(_phone_code(phone))
+                new_accounts.add(_account_code(account))
+                if last_seen is not None:
+                    last_record_seen, last_record_id = last_seen, record_id
+
+            # Bumped last_seen on known numbers brings nothing new to merge
+            new_phones = {code for code in new_phones if code is not None and not self._contains(phones, code)}
+            new_accounts = {code for code in new_accounts if code is not None and not self._contains(accounts, code)}
+            if new_phones or full:
+                phones = _merge(phones, new_phones)
+            if new_accounts or full:
+                accounts = _merge(accounts, new_accounts)
+
+            self.phones, self.accounts = phones, accounts
+            self.last_report_id = last_report_id
+            self.last_record_seen, self.last_record_id = last_record_seen, last_record_id
+            self.loaded_at = datetime.utcnow()
+            return len(reports) + len(records)
+        finally:
+            db.close()
+
+    async def reload(self) -> int:
+        """Incremental reload off the event loop (periodically a full rebuild)"""
+        full = time.monotonic() - self.last_full_load >= settings.KNOWN_BAD_FULL_RELOAD_INTERVAL
+        loop = asyncio.get_event_loop()
+        count = await loop.run_in_executor(None, self.load, full)
+        if full:
+            self.last_full_load = time.monotonic()
+        return count
+
+    async def start_scheduler(self):
+        """Load the index and keep it topped up"""
+        self.is_running = True
+        logger.info("Known-bad index scheduler started")
+
+        while self.is_running:
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Error reloading known-bad index: {e}")
+            await asyncio.sleep(settings.KNOWN_BAD_RELOAD_INTERVAL)
+
+    def stop_scheduler(self):
+        """Stop the reload scheduler"""
+        self.is_running = False
+        logger.info("Known-bad index scheduler stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and freshness"""
+        return {
+            "phones": len(self.phones),
+            "accounts": len(self.accounts),
+            "memory_bytes": (len(self.phones) + len(self.accounts)) * self.phones.itemsize,
+            "last_report_id": self.last_report_id,
+            "last_record_seen": self.last_record_seen.isoformat() if self.last_record_seen else None,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+        }
+
+
+# Singleton instance
+known_bad_index = KnownBadIndex()
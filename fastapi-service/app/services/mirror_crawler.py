@@ -0,0 +1,196 @@
+"""
+Mirror Crawler
+Walks the recent-listing pages of each source and ingests new entries into
+the local scam record index
+"""
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import asyncio
+import json
+import logging
+
+from ..config import settings
+from .cache import cache_service
+from .crawler import crawler_service, SOURCES
+from .crawl_queue import crawl_queue
+from .crawl_scheduler import crawl_scheduler
+from .page_readiness import SOURCE_READINESS, wait_until_ready
+from .browser_profile import apply_source_blocking
+from .parsers import parse_page
+from .scam_index import scam_index
+from .source_guard import source_guard
+
+logger = logging.getLogger(__name__)
+
+
+class MirrorCrawler:
+    """Incremental, rate-limited mirror of the source listing pages
+
+    Each run walks a source's listing newest-first and stops at the first
+    page containing a record from the previous run's watermark (the record
+    keys at the top of the listing last time), so steady-state runs fetch
+    one or two pages per source.
+    """
+
+    def __init__(self):
+        self.is_running = False
+        self.last_runs: Dict[str, Dict[str, Any]] = {}
+
+    async def start_scheduler(self):
+        """Start the mirror scheduler"""
+        self.is_running = True
+        logger.info("Mirror crawler started")
+
+        while self.is_running:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Error in mirror crawler: {e}")
+            await asyncio.sleep(settings.MIRROR_INTERVAL)
+
+    def stop_scheduler(self):
+        """Stop the mirror scheduler"""
+        self.is_running = False
+        logger.info("Mirror crawler stopped")
+
+    async def run_once(self) -> Dict[str, Dict[str, Any]]:
+        """Mirror every configured source once (one worker at a time)"""
+        await cache_service.connect()
+        lock_acquired = await cache_service.redis.set(
+            "scam:mirror:lock", 1, nx=True, ex=settings.MIRROR_INTERVAL
+        )
+        if not lock_acquired:
+            return {}
+
+        for source, url_template in settings.MIRROR_LISTING_URLS.items():
+            try:
+                self.last_runs[source] = await self.mirror_source(source, url_template)
+            except Exception as e:
+                logger.error(f"Mirror of {source} failed: {e}")
+                self.last_runs[source] = {"error": str(e), "finished_at": datetime.utcnow().isoformat()}
+        return self.last_runs
+
+    async def mirror_source(self, source: str, url_template: str) -> Dict[str, Any]:
+        """Ingest a source's listing pages down to the previous watermark
+
+        A walk that stops at MIRROR_MAX_PAGES (or on a failed page) before
+        reaching the watermark keeps the old watermark and records where to
+        resume; the next run continues from there, and only once the old
+        watermark (or the end of the listing) is reached does the top of
+        the listing from the walk's first page become the new watermark.
+        """
+        watermark_key = f"scam:mirror:watermark:{source}"
+        backfill_key = f"scam:mirror:backfill:{source}"
+        raw, raw_backfill = await cache_service.redis.mget(watermark_key, backfill_key)
+        watermark = set(json.loads(raw)) if raw else set()
+        backfill = json.loads(raw_backfill) if raw_backfill else None
+
+        first_page = backfill["page"] if backfill else 1
+        new_watermark: List[str] = backfill["watermark"] if backfill else []
+        pages = 0
+        ingested = 0
+        status = "max_pages"
+        resume_page = first_page + settings.MIRROR_MAX_PAGES
+
+        for page in range(first_page, first_page + settings.MIRROR_MAX_PAGES):
+            if pages:
+                await asyncio.sleep(settings.MIRROR_PAGE_DELAY)
+
+            result = await self.fetch_listing(source, url_template.format(page=page))
+            pages += 1
+            if result is None:
+                status, resume_page = "failed", page
+                break
+            if not result.get('data'):
+                status = "end_of_listing"
+                break
+            rows = scam_index.records_from_result('', result)
+
+            if page == 1:
+                new_watermark = [row['record_key'] for row in rows[:settings.MIRROR_WATERMARK_SIZE]]
+
+            new_rows = []
+            for row in rows:
+                if row['record_key'] in watermark:
+                    status = "reached_watermark"
+                    break
+                new_rows.append(row)
+
+            if new_rows:
+                loop = asyncio.get_event_loop()
+                ingested += await loop.run_in_executor(None, scam_index.upsert_records, new_rows)
+
+            if status == "reached_watermark":
+                break
+
+        if status in ("reached_watermark", "end_of_listing"):
+            if new_watermark:
+                await cache_service.redis.set(watermark_key, json.dumps(new_watermark))
+            await cache_service.redis.delete(backfill_key)
+        elif new_watermark:
+            # Not caught up yet: keep the old watermark, continue here next run
+            await cache_service.redis.set(
+                backfill_key, json.dumps({"page": resume_page, "watermark": new_watermark})
+            )
+
+        logger.info(f"Mirrored {source}: {ingested} new record(s) from {pages} page(s), {status}")
+        return {
+            "pages": pages,
+            "ingested": ingested,
+            "status": status,
+            "reached_watermark": status == "reached_watermark",
+            "resume_page": resume_page if status in ("max_pages", "failed") else None,
+            "finished_at": datetime.utcnow().isoformat(),
+        }
+
+    async def fetch_listing(self, source: str, url: str) -> Optional[Dict[str, Any]]:
+        """Fetch and parse one listing page, rendering it in Chrome if needed
+
+        Browser-only sources go straight to Chrome.
+        """
+        source_type = next(key for key, name in SOURCES.items() if name == source)
+        if await source_guard.is_open(source_type):
+            logger.warning(f"Skipping {url}: circuit open for {source}")
+            return None
+        if not await source_guard.acquire(source_type, max_wait=settings.MIRROR_INTERVAL):
+            return None
+
+        if settings.HTTP_FETCH_ENABLED and not SOURCE_READINESS[source].browser_only:
+            loop = asyncio.get_event_loop()
+            try:
+                response = await crawler_service.get_http_client().get(url)
+                response.raise_for_status()
+                result = await loop.run_in_executor(None, parse_page, source, response.text, '')
+                if result and result.get('data'):
+                    return result
+            except Exception as e:
+                logger.warning(f"HTTP listing fetch failed for {url}: {e}")
+
+        return await self.render_listing(source, url)
+
+    async def render_listing(self, source: str, url: str) -> Optional[Dict[str, Any]]:
+        """Render a listing page in Chrome, on a crawl worker in queue mode"""
+        if crawler_service.crawl_mode == "queue":
+            result = await crawl_queue.render_listing(source, url)
+            return result if result.get('success') else None
+
+        loop = asyncio.get_event_loop()
+        async with crawl_scheduler.slot('prefetch'):
+            return await loop.run_in_executor(
+                crawler_service.executor, self._render_listing, source, url
+            )
+
+    def _render_listing(self, source: str, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with crawler_service.driver_pool.borrow() as driver:
+                apply_source_blocking(driver, source)
+                driver.get(url)
+                wait_until_ready(driver, SOURCE_READINESS[source])
+                return parse_page(source, driver.page_source, '')
+        except Exception as e:
+            logger.warning(f"Rendered listing fetch failed for {url}: {e}")
+            return None
+
+
+# Singleton instance
+mirror_crawler = MirrorCrawler()
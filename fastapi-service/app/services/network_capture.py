@@ -0,0 +1,113 @@
+"""Capture AJAX search responses from Chrome's performance log"""
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
+from ..config import settings
+from .page_readiness import PageReadiness
+
+
+XHR_TYPES = ('XHR', 'Fetch')
+
+
+def enable_performance_log(options: Options):
+    """Record network events so XHR responses can be picked up"""
+    if not settings.SELENIUM_XHR_CAPTURE:
+        return
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+
+def drain_log(driver):
+    """Drop buffered events (after each page load, and before a capture)"""
+    try:
+        driver.get_log('performance')
+    except Exception:
+        pass
+
+
+def payload_html(body: str) -> str:
+    """HTML to parse from an XHR body (raw fragment or JSON wrapping one)"""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+
+    fragments = []
+
+    def collect(value: Any):
+        if isinstance(value, str):
+            if '<' in value:
+                fragments.append(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+
+    collect(data)
+    return '\n'.join(fragments)
+
+
+class XhrCapture:
+    """WebDriverWait condition that resolves on the search XHR or the DOM
+
+    Each poll reads new performance log entries; once a finished XHR/Fetch
+    response whose URL contains one of ``url_patterns`` is seen, its body is
+    fetched with ``Network.getResponseBody`` and returned as
+    ``("xhr", body)``. If the page becomes ready by the source's readiness
+    rules first (server-rendered results, a no-results marker, idle), the
+    condition returns ``("dom", state)`` instead.
+    """
+
+    def __init__(self, url_patterns: List[str], readiness: PageReadiness):
+        self.url_patterns = url_patterns
+        self.dom_ready = readiness.condition()
+        self.pending: Dict[str, str] = {}
+
+    def _matches(self, response: Dict[str, Any]) -> bool:
+        url = response.get('response', {}).get('url', '')
+        return response.get('type') in XHR_TYPES and any(p in url for p in self.url_patterns)
+
+    def _body(self, driver, request_id: str) -> Optional[str]:
+        try:
+            reply = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception:
+            return None
+        body = reply.get('body', '')
+        if reply.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        return body
+
+    def __call__(self, driver) -> Optional[Tuple[str, Any]]:
+        for entry in driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            method, params = message.get('method'), message.get('params', {})
+
+            if method == 'Network.responseReceived' and self._matches(params):
+                self.pending[params['requestId']] = params['response']['url']
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self.pending:
+                request_id = params['requestId']
+                self.pending.pop(request_id)
+                body = self._body(driver, request_id)
+                if body:
+                    return ('xhr', body)
+
+        state = self.dom_ready(driver)
+        return ('dom', state) if state else None
+
+
+def wait_for_payload(driver, url_patterns: List[str], readiness: PageReadiness,
+                     timeout: float = None) -> Tuple[str, Any]:
+    """Wait for the search XHR (or DOM readiness) after a navigation
+
+    Raises selenium's ``TimeoutException`` when neither arrives in time.
+    """
+    wait = WebDriverWait(
+        driver,
+        min(timeout or settings.SELENIUM_READY_TIMEOUT, settings.SELENIUM_TIMEOUT),
+        poll_frequency=settings.SELENIUM_READY_POLL_INTERVAL,
+    )
+    return wait.until(XhrCapture(url_patterns, readiness))
@@ -0,0 +1,126 @@
+"""Event-driven page readiness conditions for the Selenium scrapers"""
+from selenium.webdriver.support.ui import WebDriverWait
+from typing import Optional, Sequence
+import time
+from ..config import settings
+
+
+# Evaluated in the page on every poll: one round trip reports whether result
+# rows or a "no results" marker are present, plus the network activity state.
+READINESS_SCRIPT = """
+const [resultSelectors, emptySelectors, emptyTexts] = arguments;
+for (const sel of resultSelectors) {
+    if (document.querySelector(sel)) return {state: 'results'};
+}
+for (const sel of emptySelectors) {
+    if (document.querySelector(sel)) return {state: 'empty'};
+}
+if (emptyTexts.length && document.body) {
+    const text = document.body.innerText.toLowerCase();
+    for (const marker of emptyTexts) {
+        if (text.includes(marker)) return {state: 'empty'};
+    }
+}
+return {
+    state: null,
+    complete: document.readyState === 'complete',
+    ajax: window.jQuery ? window.jQuery.active : 0,
+    resources: performance.getEntriesByType('resource').length
+};
+"""
+
+
+class PageReadiness:
+    """Readiness condition for one source
+
+    A page is ready as soon as one of ``result_selectors`` matches, one of
+    ``empty_selectors`` matches, or the body contains one of ``empty_texts``.
+    When ``idle_grace`` is set, a page whose network has been idle (document
+    complete, no pending jQuery AJAX, no new resources) for that many seconds
+    is also treated as ready. ``browser_only`` marks sources whose results
+    are always rendered client-side, so a plain HTTP fetch is never tried.
+    """
+
+    def __init__(
+        self,
+        result_selectors: Sequence[str],
+        empty_selectors: Sequence[str] = (),
+        empty_texts: Sequence[str] = (),
+        idle_grace: Optional[float] = None,
+        browser_only: bool = False,
+    ):
+        self.result_selectors = list(result_selectors)
+        self.empty_selectors = list(empty_selectors)
+        self.empty_texts = [text.lower() for text in empty_texts]
+        self.idle_grace = idle_grace
+        self.browser_only = browser_only
+
+    def condition(self):
+        """Build a fresh WebDriverWait condition (idle tracking is per wait)"""
+        idle_since = None
+        last_resources = None
+
+        def _ready(driver):
+            nonlocal idle_since, last_resources
+            status = driver.execute_script(
+                READINESS_SCRIPT,
+                self.result_selectors,
+                self.empty_selectors,
+                self.empty_texts,
+            ) or {}
+
+            if status.get("state"):
+                return status["state"]
+
+            if self.idle_grace is None:
+                return False
+
+            now = time.monotonic()
+            resources = status.get("resources")
+            idle = status.get("complete") and not status.get("ajax") and resources == last_resources
+            last_resources = resources
+
+            if not idle:
+                idle_since = None
+                return False
+            if idle_since is None:
+                idle_since = now
+            return "idle" if now - idle_since >= self.idle_grace else False
+
+        return _ready
+
+
+def wait_until_ready(driver, readiness: PageReadiness, timeout: float = None) -> str:
+    """Poll until the page is ready and return the matched state
+
+    Raises selenium's ``TimeoutException`` when the hard deadline passes.
+    """
+    wait = WebDriverWait(
+        driver,
+        min(timeout or settings.SELENIUM_READY_TIMEOUT, settings.SELENIUM_TIMEOUT),
+        poll_frequency=settings.SELENIUM_READY_POLL_INTERVAL,
+    )
+    return wait.until(readiness.condition())
+
+
+# Per-source readiness conditions
+SOURCE_READINESS = {
+    "admin.vn": PageReadiness(
+        # The count banner is rendered for both hits and zero hits
+        result_selectors=["div.scam-card:not(.scam-header)", "div.alert.alert-danger"],
+        empty_texts=["không tìm thấy"],
+        idle_grace=1.0,
+    ),
+    "checkscam.vn": PageReadiness(
+        result_selectors=["div.ct div.ct1 a"],
+        empty_texts=["có 0 cảnh báo"],
+        idle_grace=1.0,
+    ),
+    "scam.vn": PageReadiness(
+        # Results are injected by AJAX, so idle must hold a bit longer
+        result_selectors=["table tr.rs", "table td a"],
+        empty_texts=["không tìm thấy kết quả", "không có kết quả"],
+        idle_grace=1.5,
+        browser_only=True,
+    ),
+}
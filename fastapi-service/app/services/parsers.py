@@ -0,0 +1,302 @@
+"""HTML result parsers shared by the HTTP and Selenium crawl engines"""
+from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional
+import multiprocessing
+import re
+import threading
+from ..config import settings
+from .page_readiness import SOURCE_READINESS
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+
+def parse_admin_vn(soup: BeautifulSoup, keyword: str) -> Dict[str, Any]:
+    """Parse an admin.vn search result page"""
+    # Get total scams count
+    alert_div = soup.find('div', class_='alert alert-danger text-center')
+    total_scams = "0"
+    search_keyword = keyword
+
+    if alert_div:
+        strong_tags = alert_div.find_all('strong')
+        if len(strong_tags) >= 2:
+            total_scams = strong_tags[0].text.strip()
+            search_keyword = strong_tags[1].text.strip()
+
+    # Get scam cards
+    scam_cards = soup.find_all('div', class_='scam-card')
+    scam_list = []
+
+    for card in scam_cards:
+        if 'scam-header' in card.get('class', []):
+            continue
+
+        columns = card.find_all('div', class_='scam-column')
+
+        if len(columns) >= 7:
+            name_div = columns[0].find('div', class_='limit')
+            name = name_div.text.strip() if name_div else ''
+
+            amount = columns[1].text.strip()
+
+            phone = columns[2].text.strip().replace('\n', '').replace(' ', '')
+            phone_parts = phone.split()
+            phone = phone_parts[-1] if phone_parts else phone
+
+            account_number = columns[3].text.strip()
+            bank = columns[4].text.strip()
+            views = columns[5].text.strip().replace('lượt xem', '').strip()
+            date = columns[6].text.strip()
+
+            link_tag = card.find('a', class_='stretched-link')
+            detail_link = link_tag['href'] if link_tag else ''
+
+            scam_list.append({
+                'name': name,
+                'amount': amount,
+                'phone': phone,
+                'account_number': account_number,
+                'bank': bank,
+                'views': views,
+                'date': date,
+                'detail_link': detail_link
+            })
+
+    return {
+        'success': True,
+        'source': 'admin.vn',
+        'keyword': search_keyword,
+        'total_scams': total_scams,
+        'data': scam_list
+    }
+
+
+def parse_checkscam_vn(soup: BeautifulSoup, keyword: str) -> Dict[str, Any]:
+    """Parse a checkscam.vn search result page"""
+    # Get total warnings count
+    h2_tag = soup.find('h2', class_='h1')
+    total_scams = "0"
+    search_keyword = keyword
+
+    if h2_tag:
+        text = h2_tag.get_text()
+        match = re.search(r'Có (\d+) cảnh báo', text)
+        if match:
+            total_scams = match.group(1)
+        match_keyword = re.search(r'"([^"]+)"', text)
+        if match_keyword:
+            search_keyword = match_keyword.group(1)
+
+    # Get warning list
+    scam_list = []
+    ct_divs = soup.find_all('div', class_='ct')
+
+    # Limit items by total_scams (listing pages have no count heading)
+    max_items = int(total_scams) if h2_tag and total_scams.isdigit() else len(ct_divs)
+
+    for i, ct in enumerate(ct_divs):
+        if i >= max_items:
+            break
+
+        ct1 = ct.find('div', class_='ct1')
+        ct2 = ct.find('div', class_='ct2')
+
+        if ct1 and ct2:
+            link_tag = ct1.find('a')
+            if link_tag:
+                name = link_tag.text.strip()
+                detail_link = link_tag['href'] if 'href' in link_tag.attrs else ''
+
+                spans = ct2.find_all('span')
+                date = ''
+                views = ''
+
+                for span in spans:
+                    text = span.text.strip()
+                    if 'Lượt xem' in text:
+                        views = text.replace('Lượt xem', '').strip()
+                    elif 'tháng' in text or '...' in text:
+                        date = text.replace('...', '').strip()
+
+                scam_list.append({
+                    'name': name,
+                    'date': date,
+                    'views': views,
+                    'detail_link': detail_link
+                })
+
+    return {
+        'success': True,
+        'source': 'checkscam.vn',
+        'keyword': search_keyword,
+        'total_scams': total_scams,
+        'data': scam_list
+    }
+
+
+def parse_scam_vn(soup: BeautifulSoup, keyword: str) -> Dict[str, Any]:
+    """Parse a scam.vn search result page (or the AJAX result fragment)"""
+    scam_list = []
+
+    # Find result table (try multiple selectors)
+    table = soup.find('table', class_='table')
+    if not table:
+        # Try finding by other attributes
+        table = soup.find('table')
+
+    if table:
+        # Find rows - try both class='rs' and all tr tags
+        result_rows = table.find_all('tr', class_='rs')
+        if not result_rows:
+            # Get all rows except header
+            all_rows = table.find_all('tr')
+            result_rows = [r for r in all_rows if len(r.find_all('td')) >= 3]
+
+        for row in result_rows:
+            tds = row.find_all('td')
+            if len(tds) >= 3:
+                # Column 1: STT (skip)
+                # Column 2: Name with link
+                name_cell = tds[1]
+                link_tag = name_cell.find('a')
+
+                # Column 3: Account info
+                account_cell = tds[2]
+
+                if link_tag:
+                    name = link_tag.get_text().strip()
+                    detail_link = link_tag.get('href', '')
+                    if detail_link.startswith('/'):
+                        detail_link = f"https://scam.vn{detail_link}"
+
+                    # Extract account number
+                    account_div = account_cell.find('div', class_='sotaikhoan')
+                    account_number = ''
+                    account_name = ''
+                    if account_div:
+                        account_spans = account_div.find_all('span', class_='hidden-info')
+                        for span in account_spans:
+                            if span.get('data-type') == 'tknganhang':
+                                account_number = span.get('data-value', '')
+                            elif span.get('data-type') == 'tenkhac':
+                                account_name = span.get('data-value', '')
+
+                    # Extract bank name
+                    bank = ''
+                    bank_div = account_cell.find('div', class_='tennganhang')
+                    if bank_div:
+                        bank_badge = bank_div.find('span', class_='badge')
+                        if bank_badge:
+                            bank = bank_badge.get_text().strip()
+
+                    scam_list.append({
+                        'name': name,
+                        'account_number': account_number,
+                        'account_name': account_name,
+                        'bank': bank,
+                        'detail_link': detail_link,
+                        'keyword_found': keyword
+                    })
+
+    return {
+        'success': True,
+        'source': 'scam.vn',
+        'keyword': keyword,
+        'total_scams': str(len(scam_list)),
+        'data': scam_list
+    }
+
+
+PARSERS = {
+    'admin.vn': parse_admin_vn,
+    'checkscam.vn': parse_checkscam_vn,
+    'scam.vn': parse_scam_vn,
+}
+
+
+def find_result_markers(soup: BeautifulSoup, source: str) -> Optional[str]:
+    """Check static HTML for the source's readiness markers
+
+    Returns ``"results"`` or ``"empty"`` when the page already carries an
+    answer, or ``None`` when the data is rendered client-side.
+    """
+    readiness = SOURCE_READINESS[source]
+
+    for selector in readiness.result_selectors:
+        if soup.select_one(selector):
+            return "results"
+    for selector in readiness.empty_selectors:
+        if soup.select_one(selector):
+            return "empty"
+    if readiness.empty_texts:
+        text = soup.get_text().lower()
+        for marker in readiness.empty_texts:
+            if marker in text:
+                return "empty"
+    return None
+
+
+def parser_backend() -> str:
+    """Tree builder to use: HTML_PARSER, or html.parser when lxml is missing"""
+    if settings.HTML_PARSER == 'lxml' and not HAS_LXML:
+        return 'html.parser'
+    return settings.HTML_PARSER
+
+
+def _parse_page(source: str, html: str, keyword: str, require_markers: bool) -> Optional[Dict[str, Any]]:
+    soup = BeautifulSoup(html, parser_backend())
+
+    if require_markers and find_result_markers(soup, source) is None:
+        return None
+
+    return PARSERS[source](soup, keyword)
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Lazily started pool for parsing large pages off the GIL"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.HTML_PARSE_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+def parse_page(source: str, html: str, keyword: str, require_markers: bool = False) -> Optional[Dict[str, Any]]:
+    """Parse a result page for ``source``
+
+    With ``require_markers`` the page is only parsed when it contains result
+    rows or a no-results marker; ``None`` tells the caller to fall back to a
+    browser render. Pages over HTML_PARSE_PROCESS_THRESHOLD characters are
+    parsed in a worker process; call this from a thread, not the event loop.
+    """
+    threshold = settings.HTML_PARSE_PROCESS_THRESHOLD
+    if threshold and len(html) >= threshold and settings.HTML_PARSE_PROCESSES > 0:
+        try:
+            future = get_process_pool().submit(_parse_page, source, html, keyword, require_markers)
+            return future.result()
+        except Exception as e:
+            # A broken pool shouldn't fail the crawl; parse in-process
+            print(f"Parse process pool error: {e}")
+            shutdown_process_pool()
+
+    return _parse_page(source, html, keyword, require_markers)
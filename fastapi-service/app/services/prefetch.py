@@ -0,0 +1,161 @@
+"""Prefetch Scheduler
+Keeps the cache warm for keywords that are searched often or trending
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import time
+
+from sqlalchemy import func, case
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import ScamSearch
+from .cache import cache_service
+from .crawler import crawler_service, SOURCES
+from .keywords import normalize_keyword
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchScheduler:
+    """Refresh hot keywords' cache entries shortly before they expire
+
+    Each run scores keywords from scam_searches over two sliding windows:
+    frequent (searches in PREFETCH_FREQUENT_WINDOW) and trending (searches
+    in the short PREFETCH_TRENDING_WINDOW, weighted by how far that rate
+    is above the keyword's long-window rate). Source entries of the top
+    keywords that are missing or within PREFETCH_LEAD_TIME (at most half
+    their TTL) of their soft expiry are re-crawled at prefetch priority, at most
+    PREFETCH_CRAWL_BUDGET crawls per run.
+    """
+
+    def __init__(self):
+        self.is_running = False
+        self.last_run: Dict[str, Any] = {}
+
+    async def start_scheduler(self):
+        """Start the prefetch scheduler"""
+        self.is_running = True
+        logger.info("Prefetch scheduler started")
+
+        while self.is_running:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Error in prefetch scheduler: {e}")
+            await asyncio.sleep(settings.PREFETCH_INTERVAL)
+
+    def stop_scheduler(self):
+        """Stop the prefetch scheduler"""
+        self.is_running = False
+        logger.info("Prefetch scheduler stopped")
+
+    def hot_keywords(self) -> List[Tuple[str, float]]:
+        """Top (keyword, score) pairs from recent search history"""
+        now = datetime.now(timezone.utc)
+        long_since = now - timedelta(seconds=settings.PREFETCH_FREQUENT_WINDOW)
+        short_since = now - timedelta(seconds=settings.PREFETCH_TRENDING_WINDOW)
+
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                ScamSearch.keyword,
+                func.count(ScamSearch.id),
+                func.sum(case((ScamSearch.search_time >= short_since, 1), else_=0)),
+            ).filter(
+                ScamSearch.search_time >= long_since
+            ).group_by(ScamSearch.keyword).all()
+        finally:
+            db.close()
+
+        # Older rows may predate keyword normalization
+        counts: Dict[str, List[int]] = {}
+        for keyword, total, recent in rows:
+            entry = counts.setdefault(normalize_keyword(keyword), [0, 0])
+            entry[0] += total
+            entry[1] += recent or 0
+
+        window_ratio = settings.PREFETCH_TRENDING_WINDOW / settings.PREFETCH_FREQUENT_WINDOW
+        scored = []
+        for keyword, (total, recent) in counts.items():
+            if not keyword:
+                continue
+            # How much faster than its usual rate the keyword is searched now
+            lift = recent / max(total * window_ratio, 1.0)
+            trending = recent >= settings.PREFETCH_TRENDING_MIN_SEARCHES and lift >= settings.PREFETCH_TRENDING_LIFT
+            if total < settings.PREFETCH_MIN_SEARCHES and not trending:
+                continue
+            score = total + (recent * lift if trending else 0)
+            scored.append((keyword, score))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:settings.PREFETCH_MAX_KEYWORDS]
+
+    def lead_time(self, entry: Optional[Dict[str, Any]]) -> float:
+        """How long before soft expiry an entry is due for a refresh
+
+        Capped at half the entry's TTL, so short-TTL entries aren't
+        re-crawled as soon as they are stored.
+        """
+        if entry and entry.get("ttl"):
+            return min(settings.PREFETCH_LEAD_TIME, entry["ttl"] / 2)
+        return settings.PREFETCH_LEAD_TIME
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Refresh due cache entries of hot keywords (one worker at a time)"""
+        await cache_service.connect()
+        if not await cache_service.redis.set(
+            "scam:prefetch:lock", 1, nx=True, ex=settings.PREFETCH_INTERVAL
+        ):
+            return {}
+
+        loop = asyncio.get_event_loop()
+        hot = await loop.run_in_executor(None, self.hot_keywords)
+        sources = list(SOURCES)
+        entries = await cache_service.get_scam_sources_many([keyword for keyword, _ in hot], sources)
+
+        # Hottest keywords first, so the budget goes where it matters most
+        now = time.time()
+        due = []
+        for keyword, _ in hot:
+            for source in sources:
+                entry = entries[keyword].get(source)
+                fresh_for = entry["fresh_until"] - now if entry else 0
+                if fresh_for < self.lead_time(entry):
+                    due.append((keyword, source))
+
+        refreshed, skipped = 0, 0
+        semaphore = asyncio.Semaphore(settings.PREFETCH_CONCURRENCY)
+
+        async def refresh(keyword: str, source: str):
+            async with semaphore:
+                await crawler_service.search_source(source, keyword, use_cache=False, priority='prefetch')
+
+        tasks = []
+        for keyword, source in due[:settings.PREFETCH_CRAWL_BUDGET]:
+            # Don't duplicate a stale-while-revalidate refresh already running
+            if not await cache_service.mark_refreshing(keyword, source, settings.SINGLE_FLIGHT_LOCK_TTL):
+                skipped += 1
+                continue
+            tasks.append(asyncio.ensure_future(refresh(keyword, source)))
+            refreshed += 1
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.last_run = {
+            "hot_keywords": len(hot),
+            "due": len(due),
+            "refreshed": refreshed,
+            "skipped": skipped,
+            "over_budget": max(0, len(due) - settings.PREFETCH_CRAWL_BUDGET),
+            "finished_at": datetime.utcnow().isoformat(),
+        }
+        logger.info(f"Prefetch refreshed {refreshed} of {len(due)} due cache entries")
+        return self.last_run
+
+
+# Singleton instance
+prefetch_scheduler = PrefetchScheduler()
@@ -0,0 +1,145 @@
+"""Typed scam records and their compact positional encoding
+
+Scrapers produce loosely shaped dicts (``total_scams`` as text, source
+specific item keys). They are normalized into these records once, where a
+crawl result enters the crawler; everything downstream can rely on an int
+``total_scams`` and one set of entry fields.
+"""
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional
+import re
+
+
+def _to_int(value: Any) -> int:
+    """Count from an int or scraped text ("12", "1.234 báo cáo"); 0 if none"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    digits = re.sub(r'\D', '', str(value or ''))
+    return int(digits) if digits else 0
+
+
+def _to_str(value: Any) -> str:
+    return '' if value is None else str(value)
+
+
+@dataclass(slots=True)
+class ScamEntry:
+    """One reported scam in a source's result list"""
+    name: str = ''
+    phone: str = ''
+    account_number: str = ''
+    account_name: str = ''
+    bank: str = ''
+    amount: str = ''
+    views: str = ''
+    date: str = ''
+    report_time: str = ''
+    detail_link: str = ''
+    keyword_found: str = ''
+    source: str = ''  # upstream feed, for aggregated sources (chongluadao.vn)
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> 'ScamEntry':
+        values = {name: _to_str(item.get(name)) for name in ENTRY_FIELDS if item.get(name) is not None}
+        if not values.get('account_number') and item.get('account'):
+            values['account_number'] = _to_str(item['account'])
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, str]:
+        """Fields that carry a value (sources fill different subsets)"""
+        return {name: getattr(self, name) for name in ENTRY_FIELDS if getattr(self, name)}
+
+
+ENTRY_FIELDS = tuple(f.name for f in fields(ScamEntry))
+
+
+@dataclass(slots=True)
+class SourceResult:
+    """A successful crawl of one source"""
+    source: str
+    keyword: str = ''
+    total_scams: int = 0
+    data: List[ScamEntry] = field(default_factory=list)
+    engine: Optional[str] = None
+    success: bool = True
+
+    @classmethod
+    def from_dict(cls, result: Dict[str, Any]) -> 'SourceResult':
+        return cls(
+            source=_to_str(result.get('source')),
+            keyword=_to_str(result.get('keyword')),
+            total_scams=_to_int(result.get('total_scams')),
+            data=[ScamEntry.from_dict(item) for item in result.get('data') or [] if isinstance(item, dict)],
+            engine=result.get('engine'),
+            success=bool(result.get('success', True)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            'success': self.success,
+            'source': self.source,
+            'keyword': self.keyword,
+            'total_scams': self.total_scams,
+            'data': [entry.to_dict() for entry in self.data],
+        }
+        if self.engine:
+            result['engine'] = self.engine
+        return result
+
+    def to_row(self) -> list:
+        """Positional form for the cache: entries as value arrays, no field names"""
+        return [
+            self.source, self.keyword, self.total_scams, self.engine, self.success,
+            [[getattr(entry, name) for name in ENTRY_FIELDS] for entry in self.data],
+        ]
+
+    @classmethod
+    def from_row(cls, row: list) -> 'SourceResult':
+        source, keyword, total_scams, engine, success, entries = row
+        return cls(
+            source=source,
+            keyword=keyword,
+            total_scams=total_scams,
+            data=[ScamEntry(*values) for values in entries],
+            engine=engine,
+            success=success,
+        )
+
+
+def normalize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a successful scraper result dict; other results pass through"""
+    if not result or not result.get('success'):
+        return result
+    return SourceResult.from_dict(result).to_dict()
+
+
+# Bumped whenever ScamEntry/SourceResult fields change, since rows are positional
+CACHE_ENTRY_VERSION = 1
+
+
+def cache_entry_to_row(entry: Dict[str, Any]) -> list:
+    """Compact form of a per-source cache entry (``{"data", "fresh_until", ...}``)"""
+    return [
+        CACHE_ENTRY_VERSION,
+        SourceResult.from_dict(entry['data']).to_row(),
+        entry['fresh_until'],
+        entry['stored_at'],
+        entry.get('ttl'),
+        entry.get('hash'),
+    ]
+
+
+def cache_entry_from_row(row: list) -> Optional[Dict[str, Any]]:
+    """Inverse of ``cache_entry_to_row``; None for an unknown version"""
+    if row[0] != CACHE_ENTRY_VERSION:
+        return None
+    _, result, fresh_until, stored_at, ttl, fingerprint = row
+    return {
+        'data': SourceResult.from_row(result).to_dict(),
+        'fresh_until': fresh_until,
+        'stored_at': stored_at,
+        'ttl': ttl,
+        'hash': fingerprint,
+    }
@@ -0,0 +1,186 @@
+"""Local Postgres index of scam records collected by the crawlers"""
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from typing import Dict, Any, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import re
+from ..database import SessionLocal
+from ..models import ScamRecord
+from .keywords import is_phone_number, is_bank_account, normalize_keyword, normalize_phone
+
+
+def _canonical_phone(value: str) -> Optional[str]:
+    if value and is_phone_number(value):
+        return normalize_phone(value)
+    return None
+
+
+def _canonical_account(value: str) -> Optional[str]:
+    digits = re.sub(r'\D', '', value or '')
+    return digits if 6 <= len(digits) <= 16 else None
+
+
+def _identifiers_in_text(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """Find a phone and/or account number inside free text (e.g. a post title)"""
+    phone = account = None
+    for token in re.findall(r'\+?\d[\d\s\.\-]{5,18}\d', text or ''):
+        if not phone and _canonical_phone(token):
+            phone = _canonical_phone(token)
+        elif not account and _canonical_account(token):
+            account = _canonical_account(token)
+    return phone, account
+
+
+class ScamIndex:
+    """Upserts crawled records and answers phone/account lookups from them"""
+
+    def records_from_result(self, keyword: str, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Turn one source result into scam_records rows
+
+        Sites match records on fields they do not always display (checkscam.vn
+        shows only a title), so a record with no phone/account of its own is
+        keyed by one found in its title, or else by the keyword it was found
+        for (``keyword`` may be empty for listing pages).
+        """
+        source = result.get('source', '')
+        keyword = normalize_keyword(keyword) if keyword else ''
+        keyword_phone = keyword if is_phone_number(keyword) else None
+        keyword_account = keyword if not keyword_phone and is_bank_account(keyword) else None
+
+        rows = []
+        for item in result.get('data') or []:
+            phone = item.get('phone', '')
+            account = item.get('account_number') or item.get('account', '')
+            phone_canonical = _canonical_phone(phone)
+            account_canonical = _canonical_account(account)
+
+            if not phone_canonical and not account_canonical:
+                phone_canonical, account_canonical = _identifiers_in_text(item.get('name', ''))
+            if not phone_canonical and not account_canonical:
+                phone_canonical = keyword_phone
+                account_canonical = keyword_account
+            if not phone_canonical and not account_canonical:
+                continue
+
+            identity = item.get('detail_link') or '|'.join(
+                [item.get('name', ''), phone_canonical or '', account_canonical or '']
+            )
+            rows.append({
+                'record_key': hashlib.sha1(f"{source}|{identity}".encode('utf-8')).hexdigest(),
+                'source': source,
+                'name': (item.get('name') or '')[:255],
+                'phone': (phone or '')[:50],
+                'phone_canonical': phone_canonical,
+                'account_number': (account or '')[:50],
+                'account_canonical': account_canonical,
+                'bank': (item.get('bank') or '')[:255],
+                'amount': (item.get('amount') or '')[:100],
+                'detail_link': (item.get('detail_link') or '')[:500],
+                'data': item,
+            })
+        return rows
+
+    def upsert_records(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert new records and bump last_seen on known ones"""
+        if not rows:
+            return 0
+
+        # One statement can't touch the same key twice
+        rows = list({row['record_key']: row for row in rows}.values())
+
+        db = SessionLocal()
+        try:
+            stmt = insert(ScamRecord).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ScamRecord.record_key],
+                set_={
+                    'name': stmt.excluded.name,
+                    'phone': stmt.excluded.phone,
+                    'account_number': stmt.excluded.account_number,
+                    'bank': stmt.excluded.bank,
+                    'amount': stmt.excluded.amount,
+                    'data': stmt.excluded.data,
+                    'phone_canonical': func.coalesce(ScamRecord.phone_canonical, stmt.excluded.phone_canonical),
+                    'account_canonical': func.coalesce(ScamRecord.account_canonical, stmt.excluded.account_canonical),
+                    'last_seen': func.now(),
+                }
+            )
+            db.execute(stmt)
+            db.commit()
+            return len(rows)
+        except Exception as e:
+            print(f"Scam index upsert error: {e}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+    async def index_result(self, keyword: str, result: Dict[str, Any]) -> int:
+        """Index a crawled source result off the event loop"""
+        rows = self.records_from_result(keyword, result)
+        if not rows:
+            return 0
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.upsert_records, rows)
+
+    def lookup(self, db: Session, keyword: str) -> List[ScamRecord]:
+        """Records indexed under a phone or account keyword"""
+        keyword = normalize_keyword(keyword)
+        if is_phone_number(keyword):
+            query = db.query(ScamRecord).filter(ScamRecord.phone_canonical == keyword)
+        elif is_bank_account(keyword):
+            query = db.query(ScamRecord).filter(ScamRecord.account_canonical == keyword)
+        else:
+            return []
+        return query.order_by(ScamRecord.last_seen.desc()).limit(200).all()
+
+    def indexed_sources(
+        self,
+        keyword: str,
+        source_names: Set[str],
+        db: Optional[Session] = None
+    ) -> List[Dict[str, Any]]:
+        """Per-source results indexed under ``keyword`` for the given sources"""
+        session = db or SessionLocal()
+        try:
+            return [
+                source for source in self.build_sources(self.lookup(session, keyword))
+                if source['source'] in source_names
+            ]
+        except Exception as e:
+            print(f"Scam index lookup error: {e}")
+            return []
+        finally:
+            if db is None:
+                session.close()
+
+    def build_sources(self, records: List[ScamRecord]) -> List[Dict[str, Any]]:
+        """Group indexed records into per-source results (search response shape)"""
+        by_source: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            by_source.setdefault(record.source, []).append(record.data or {
+                'name': record.name,
+                'phone': record.phone,
+                'account_number': record.account_number,
+                'bank': record.bank,
+                'amount': record.amount,
+                'detail_link': record.detail_link,
+            })
+
+        return [
+            {
+                'success': True,
+                'source': source,
+                'total_scams': len(items),
+                'data': items,
+                'status': 'complete',
+                'from_index': True,
+            }
+            for source, items in by_source.items()
+        ]
+
+
+# Singleton instance
+scam_index = ScamIndex()
@@ -0,0 +1,160 @@
+"""Asynchronous scam search jobs with state kept in Redis"""
+from typing import Dict, Any, List, Optional, Callable, AsyncIterator
+from datetime import datetime
+import asyncio
+import json
+import uuid
+
+from ..config import settings
+from .cache import cache_service
+from .crawler import crawler_service, SOURCES
+
+
+class SearchJobService:
+    """Run searches in the background and let any replica report on them
+
+    A job is a Redis hash ``scam:job:{id}`` holding its status, each source
+    result as it finishes (``source:{type}`` fields) and the final result.
+    Progress is also published on ``scam:job:events:{id}`` for push clients.
+    """
+
+    def __init__(self):
+        self.tasks = set()
+
+    def job_key(self, job_id: str) -> str:
+        return f"scam:job:{job_id}"
+
+    def events_channel(self, job_id: str) -> str:
+        return f"scam:job:events:{job_id}"
+
+    async def submit(
+        self,
+        keyword: str,
+        sources: List[str],
+        on_done: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Store a queued job, start it in the background and return its state"""
+        await cache_service.connect()
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow().isoformat()
+        await cache_service.redis.hset(self.job_key(job_id), mapping={
+            "id": job_id,
+            "keyword": keyword,
+            "source_types": json.dumps(sources),
+            "status": "queued",
+            "created_at": now,
+            "updated_at": now,
+        })
+        await cache_service.redis.expire(self.job_key(job_id), settings.SEARCH_JOB_TTL)
+
+        task = asyncio.ensure_future(self.run(job_id, keyword, sources, on_done))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+        return await self.get(job_id)
+
+    async def run(
+        self,
+        job_id: str,
+        keyword: str,
+        sources: List[str],
+        on_done: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Run a job to completion, recording progress as each source finishes"""
+        key = self.job_key(job_id)
+        try:
+            await self._update(job_id, {"status": "running"})
+
+            results = {}
+            indexed = asyncio.ensure_future(crawler_service.lookup_indexed(keyword, sources))
+            async for source, result in crawler_service.iter_all_sources(keyword, sources):
+                results[source] = result
+                await self._update(job_id, {f"source:{source}": json.dumps(result, ensure_ascii=False)})
+                await self._publish(job_id, "source", {"source": result.get("source"), "data": result})
+
+            result = crawler_service.build_search_result(keyword, [results[source] for source in sources])
+            result = crawler_service.merge_indexed(keyword, result, await indexed)
+            await self._update(job_id, {"status": "done", "result": json.dumps(result, ensure_ascii=False)})
+            await self._publish(job_id, "done", result)
+
+            if on_done:
+                on_done(result)
+            return result
+        except Exception as e:
+            print(f"Search job {job_id} error: {e}")
+            try:
+                await self._update(job_id, {"status": "failed", "error": str(e)})
+                await self._publish(job_id, "failed", {"detail": str(e)})
+            except Exception as state_error:
+                print(f"Search job {job_id} state error: {state_error}")
+            return None
+        finally:
+            # Keep finished jobs readable for the full TTL
+            await cache_service.redis.expire(key, settings.SEARCH_JOB_TTL)
+
+    async def _update(self, job_id: str, fields: Dict[str, str]):
+        fields["updated_at"] = datetime.utcnow().isoformat()
+        await cache_service.redis.hset(self.job_key(job_id), mapping=fields)
+
+    async def _publish(self, job_id: str, event: str, payload: Dict[str, Any]):
+        message = json.dumps({"event": event, "payload": payload}, ensure_ascii=False)
+        await cache_service.redis.publish(self.events_channel(job_id), message)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current job state, or None if unknown or expired"""
+        await cache_service.connect()
+        fields = await cache_service.redis.hgetall(self.job_key(job_id))
+        if not fields:
+            return None
+
+        source_types = json.loads(fields.get("source_types", "[]"))
+        finished = {
+            source: json.loads(fields[f"source:{source}"])
+            for source in source_types if f"source:{source}" in fields
+        }
+        return {
+            "id": fields["id"],
+            "keyword": fields["keyword"],
+            "status": fields["status"],
+            "sources": finished,
+            "pending_sources": [SOURCES[source] for source in source_types if source not in finished],
+            "result": json.loads(fields["result"]) if "result" in fields else None,
+            "error": fields.get("error"),
+            "created_at": fields["created_at"],
+            "updated_at": fields["updated_at"],
+        }
+
+    async def events(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield job events until it finishes, starting with the current state
+
+        The subscription is opened before the state is read so no event
+        published in between is lost.
+        """
+        await cache_service.connect()
+        pubsub = cache_service.redis.pubsub()
+        await pubsub.subscribe(self.events_channel(job_id))
+        try:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            yield {"event": "state", "payload": job}
+            if job["status"] in ("done", "failed"):
+                return
+
+            loop = asyncio.get_event_loop()
+            deadline = loop.time() + settings.SEARCH_JOB_STREAM_TIMEOUT
+            while loop.time() < deadline:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    continue
+                event = json.loads(message["data"])
+                yield event
+                if event["event"] in ("done", "failed"):
+                    return
+        finally:
+            await pubsub.unsubscribe(self.events_channel(job_id))
+            await pubsub.close()
+
+
+# Singleton instance
+search_job_service = SearchJobService()
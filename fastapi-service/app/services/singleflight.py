@@ -0,0 +1,156 @@
+"""Single-flight coalescing of identical in-flight crawls"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import json
+import time
+import uuid
+from ..config import settings
+from .cache import cache_service
+
+
+# Delete the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Run one crawl per key and share its result with every concurrent caller
+
+    Within a process, callers await the same asyncio task. Across workers,
+    the first caller takes a Redis lock and publishes its result on a
+    pub/sub channel that the other workers' callers wait on.
+    """
+
+    def __init__(self, prefix: str = "scam:flight"):
+        self.prefix = prefix
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {
+            "leaders": 0,
+            "local_followers": 0,
+            "remote_followers": 0,
+            "remote_rechecks": 0,
+            "remote_fallbacks": 0,
+        }
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        recheck: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """Return ``fn()``'s result, sharing one execution per key
+
+        ``recheck`` is called when another worker's result was missed (it
+        finished before we subscribed); a non-None answer, e.g. the cache
+        entry the leader just wrote, is returned instead of running ``fn``.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, fn, recheck))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self._stats["local_followers"] += 1
+
+        # Shield so one caller giving up does not cancel the shared crawl
+        result = await asyncio.shield(task)
+        return dict(result) if isinstance(result, dict) else result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing counters"""
+        return {"in_flight": len(self._inflight), **self._stats}
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved; callers already saw it
+
+    async def _run(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        recheck: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        try:
+            await cache_service.connect()
+            redis = cache_service.redis
+            lock_key = f"{self.prefix}:lock:{key}"
+            token = uuid.uuid4().hex
+            acquired = await redis.set(lock_key, token, nx=True, ex=settings.SINGLE_FLIGHT_LOCK_TTL)
+        except Exception as e:
+            print(f"Single-flight lock error: {e}")
+            self._stats["leaders"] += 1
+            return await fn()
+
+        if acquired:
+            return await self._lead(key, fn, lock_key, token)
+
+        result = await self._follow(key, lock_key)
+        if result is not None:
+            self._stats["remote_followers"] += 1
+            return result
+
+        if recheck is not None:
+            result = await recheck()
+            if result is not None:
+                self._stats["remote_rechecks"] += 1
+                return result
+
+        # The leader died or its message was missed; crawl ourselves
+        self._stats["remote_fallbacks"] += 1
+        return await fn()
+
+    async def _lead(self, key: str, fn: Callable[[], Awaitable[Any]], lock_key: str, token: str) -> Any:
+        self._stats["leaders"] += 1
+        redis = cache_service.redis
+        channel = f"{self.prefix}:result:{key}"
+        message = {"ok": False}
+
+        try:
+            result = await fn()
+            message = {"ok": True, "result": result}
+            return result
+        finally:
+            try:
+                await redis.publish(channel, json.dumps(message, ensure_ascii=False))
+                await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                print(f"Single-flight publish error: {e}")
+
+    async def _follow(self, key: str, lock_key: str) -> Any:
+        """Wait for another worker's result; None means run it ourselves"""
+        redis = cache_service.redis
+        channel = f"{self.prefix}:result:{key}"
+        pubsub = redis.pubsub()
+        deadline = time.monotonic() + settings.SINGLE_FLIGHT_LOCK_TTL
+
+        try:
+            await pubsub.subscribe(channel)
+            while time.monotonic() < deadline:
+                # The leader may have finished before we subscribed
+                if not await redis.exists(lock_key):
+                    return None
+
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message.get("type") == "message":
+                    payload = json.loads(message["data"])
+                    return payload.get("result") if payload.get("ok") else None
+            return None
+        except Exception as e:
+            print(f"Single-flight follow error: {e}")
+            return None
+        finally:
+            try:
+                await pubsub.unsubscribe(channel)
+                await pubsub.close()
+            except Exception:
+                pass
+
+
+# Singleton instance
+single_flight = SingleFlight()
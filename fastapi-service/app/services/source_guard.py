@@ -0,0 +1,174 @@
+"""Per-source rate limiting and circuit breaking shared across workers"""
+from typing import Dict, Any
+import asyncio
+import time
+from ..config import settings
+from .cache import cache_service
+
+
+# Refill the bucket from Redis server time and take one token; returns the
+# seconds to wait before a token is available (as a string, Lua numbers
+# would be truncated to integers)
+TAKE_TOKEN_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('time')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('hmget', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('hset', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('expire', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+# Count a failure; open the breaker at the threshold or when a half-open
+# probe fails. Returns the resulting state.
+RECORD_FAILURE_SCRIPT = """
+local failures = redis.call('hincrby', KEYS[1], 'failures', 1)
+local state = redis.call('hget', KEYS[1], 'state') or 'closed'
+if state == 'half_open' or failures >= tonumber(ARGV[1]) then
+    redis.call('hset', KEYS[1], 'state', 'open', 'opened_at', ARGV[2])
+    redis.call('del', KEYS[2])
+    state = 'open'
+end
+return state
+"""
+
+
+class SourceGuard:
+    """Token bucket and circuit breaker per scrape target, kept in Redis
+
+    Every crawl of a source first takes a token from its bucket
+    (SOURCE_RATE_LIMITS requests/s, SOURCE_RATE_BURST burst), so all API
+    processes and crawl workers together stay under the limit. The breaker
+    opens after SOURCE_BREAKER_FAILURES consecutive failures or slow crawls;
+    while open the source is short-circuited, and after
+    SOURCE_BREAKER_COOLDOWN seconds a single probe crawl is let through
+    (half-open) whose outcome closes or re-opens it.
+
+    Redis errors fail open: the guard never blocks crawling on its own.
+    """
+
+    def bucket_key(self, source: str) -> str:
+        return f"scam:ratelimit:{source}"
+
+    def breaker_key(self, source: str) -> str:
+        return f"scam:breaker:{source}"
+
+    def probe_key(self, source: str) -> str:
+        return f"scam:breaker:{source}:probe"
+
+    async def acquire(self, source: str, max_wait: float = None) -> bool:
+        """Take a rate-limit token, waiting up to ``max_wait`` seconds for one"""
+        rate = settings.SOURCE_RATE_LIMITS.get(source)
+        if not rate:
+            return True
+        burst = settings.SOURCE_RATE_BURST.get(source, 1)
+        max_wait = settings.SOURCE_RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+
+        deadline = time.monotonic() + max_wait
+        try:
+            await cache_service.connect()
+            while True:
+                wait = float(await cache_service.redis.eval(
+                    TAKE_TOKEN_SCRIPT, 1, self.bucket_key(source), rate, burst
+                ))
+                if wait <= 0:
+                    return True
+                if time.monotonic() + wait > deadline:
+                    return False
+                await asyncio.sleep(wait)
+        except Exception as e:
+            print(f"Rate limiter error for {source}: {e}")
+            return True
+
+    async def allow(self, source: str) -> bool:
+        """Whether a crawl of ``source`` may run now (breaker closed or probing)"""
+        try:
+            await cache_service.connect()
+            state = await cache_service.redis.hgetall(self.breaker_key(source))
+            if state.get('state', 'closed') == 'closed':
+                return True
+            if time.time() - float(state.get('opened_at', 0)) < settings.SOURCE_BREAKER_COOLDOWN:
+                return False
+
+            # Cooldown over: let exactly one probe through
+            if await cache_service.redis.set(
+                self.probe_key(source), 1, nx=True, ex=settings.SOURCE_BREAKER_PROBE_TTL
+            ):
+                await cache_service.redis.hset(self.breaker_key(source), 'state', 'half_open')
+                return True
+            return False
+        except Exception as e:
+            print(f"Circuit breaker error for {source}: {e}")
+            return True
+
+    async def is_open(self, source: str) -> bool:
+        """Read-only check: breaker open and still cooling down"""
+        try:
+            await cache_service.connect()
+            state = await cache_service.redis.hmget(self.breaker_key(source), 'state', 'opened_at')
+            return state[0] == 'open' and time.time() - float(state[1] or 0) < settings.SOURCE_BREAKER_COOLDOWN
+        except Exception as e:
+            print(f"Circuit breaker error for {source}: {e}")
+            return False
+
+    async def record_success(self, source: str):
+        """Close the breaker and reset its failure count"""
+        try:
+            await cache_service.redis.delete(self.breaker_key(source), self.probe_key(source))
+        except Exception as e:
+            print(f"Circuit breaker error for {source}: {e}")
+
+    async def record_failure(self, source: str) -> str:
+        """Count a failed or too-slow crawl; returns the breaker state"""
+        try:
+            state = await cache_service.redis.eval(
+                RECORD_FAILURE_SCRIPT, 2, self.breaker_key(source), self.probe_key(source),
+                settings.SOURCE_BREAKER_FAILURES, time.time()
+            )
+            if state == 'open':
+                print(f"⚠️ Circuit opened for {source}")
+            return state
+        except Exception as e:
+            print(f"Circuit breaker error for {source}: {e}")
+            return 'closed'
+
+    async def get_state(self, source: str) -> Dict[str, Any]:
+        """Breaker state and remaining rate-limit tokens for a source"""
+        await cache_service.connect()
+        breaker = await cache_service.redis.hgetall(self.breaker_key(source))
+        bucket = await cache_service.redis.hgetall(self.bucket_key(source))
+
+        state = breaker.get('state', 'closed')
+        opened_at = float(breaker['opened_at']) if 'opened_at' in breaker else None
+        rate = settings.SOURCE_RATE_LIMITS.get(source)
+        burst = settings.SOURCE_RATE_BURST.get(source, 1)
+        tokens = None
+        if rate:
+            tokens = float(bucket.get('tokens', burst))
+            if 'ts' in bucket:
+                tokens = min(burst, tokens + max(0.0, time.time() - float(bucket['ts'])) * rate)
+
+        return {
+            'state': state,
+            'failures': int(breaker.get('failures', 0)),
+            'opened_at': opened_at,
+            'retry_in': max(0, int(opened_at + settings.SOURCE_BREAKER_COOLDOWN - time.time()))
+                        if state == 'open' and opened_at else 0,
+            'rate_limit': rate,
+            'burst': burst if rate else None,
+            'tokens': round(tokens, 2) if tokens is not None else None,
+        }
+
+
+# Singleton instance
+source_guard = SourceGuard()
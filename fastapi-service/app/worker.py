@@ -0,0 +1,114 @@
+"""Crawl worker: consumes crawl jobs from the Redis stream
+
+Run with ``python -m app.worker``. Each worker owns its own Chrome driver
+pool, crawls jobs enqueued by the API (CRAWL_MODE=queue), caches the result
+and hands it back to the waiting API process.
+"""
+import asyncio
+import os
+import signal
+import socket
+
+from .config import settings
+from .services import cache_service, crawler_service
+from .services.crawl_queue import crawl_queue
+from .services.crawl_scheduler import crawl_scheduler
+from .services.crawler import SOURCES
+from .services.mirror_crawler import mirror_crawler
+
+
+class CrawlWorker:
+    """Stream consumer running up to CRAWL_WORKER_CONCURRENCY crawls at once"""
+
+    def __init__(self):
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.is_running = False
+        self.in_flight = set()
+
+    async def run(self):
+        await crawl_queue.ensure_group()
+        self.is_running = True
+        print(f"🛠️ Crawl worker {self.consumer} consuming {settings.CRAWL_STREAM}")
+
+        while self.is_running:
+            try:
+                free = settings.CRAWL_WORKER_CONCURRENCY - len(self.in_flight)
+                if free <= 0:
+                    await asyncio.wait(self.in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                messages = await crawl_queue.claim_stale(self.consumer, free)
+                if not messages:
+                    messages = await crawl_queue.read(self.consumer, free, block_ms=5000)
+
+                for priority, message_id, fields in messages:
+                    crawl_scheduler.record(priority)
+                    task = asyncio.ensure_future(self.handle(priority, message_id, fields))
+                    self.in_flight.add(task)
+                    task.add_done_callback(self.in_flight.discard)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Crawl worker loop error: {e}")
+                await asyncio.sleep(1)
+
+        if self.in_flight:
+            await asyncio.wait(self.in_flight)
+
+    async def handle(self, priority: str, message_id: str, fields: dict):
+        """Crawl one job; on an exception or failed result leave it pending so it is retried"""
+        job_id, source, keyword = fields.get("id"), fields.get("source"), fields.get("keyword")
+
+        deliveries = await crawl_queue.delivery_count(priority, message_id)
+        if deliveries > settings.CRAWL_QUEUE_MAX_DELIVERIES:
+            error = f"Gave up after {deliveries - 1} attempts"
+            await crawl_queue.dead_letter(priority, message_id, fields, error)
+            await crawl_queue.push_result(job_id, {'success': False, 'source': SOURCES.get(source, source), 'error': error})
+            return
+
+        try:
+            if fields.get("kind") == "listing":
+                result = await mirror_crawler.render_listing(source, fields.get("url")) or {
+                    'success': False, 'source': source, 'error': "Listing render failed"
+                }
+            else:
+                result = await crawler_service.crawl_source(source, keyword, priority)
+        except Exception as e:
+            print(f"Crawl job {job_id} ({source}:{keyword}) failed, will retry: {e}")
+            return
+
+        await crawl_queue.push_result(job_id, result)
+        if result.get('success'):
+            await crawl_queue.ack(priority, message_id)
+        else:
+            # The waiting API gets the failure now; the job stays pending and
+            # is redelivered (dead-lettered after CRAWL_QUEUE_MAX_DELIVERIES)
+            print(f"Crawl job {job_id} ({source}:{keyword}) failed, will retry: {result.get('error')}")
+
+    def stop(self):
+        self.is_running = False
+
+
+async def main():
+    # This process does the crawling itself
+    crawler_service.crawl_mode = "inline"
+    # Jobs are counted as they are dequeued, browser crawl or not
+    crawl_scheduler.record_slots = False
+
+    await cache_service.connect()
+    await crawler_service.start()
+
+    worker = CrawlWorker()
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await crawler_service.shutdown()
+        await cache_service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
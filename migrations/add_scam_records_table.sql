@@ -0,0 +1,26 @@
+-- Migration: Add local scam record index
+-- Created: 2026-10-18
+
+-- Create scam_records table
+CREATE TABLE IF NOT EXISTS scam_records (
+    id SERIAL PRIMARY KEY,
+    record_key VARCHAR(64) NOT NULL UNIQUE,
+    source VARCHAR(50) NOT NULL,
+    name VARCHAR(255),
+    phone VARCHAR(50),
+    phone_canonical VARCHAR(20),
+    account_number VARCHAR(50),
+    account_canonical VARCHAR(32),
+    bank VARCHAR(255),
+    amount VARCHAR(100),
+    detail_link VARCHAR(500),
+    data JSON,
+    first_seen TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    last_seen TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Lookups are by canonical phone / account number
+CREATE INDEX IF NOT EXISTS ix_scam_records_phone_canonical ON scam_records(phone_canonical);
+CREATE INDEX IF NOT EXISTS ix_scam_records_account_canonical ON scam_records(account_canonical);
+CREATE INDEX IF NOT EXISTS ix_scam_records_source ON scam_records(source);
+CREATE INDEX IF NOT EXISTS ix_scam_records_last_seen ON scam_records(last_seen);